@@ -117,6 +117,16 @@ class DatabaseDict:
                 raise KeyError(key)
         self._cache_valid = False
     
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete several items in one statement/transaction; returns count deleted"""
+        if not keys:
+            return 0
+        with DatabaseManager() as db:
+            repo = self._get_repository(db)
+            count = repo.delete_many(keys)
+        self._cache_valid = False
+        return count
+    
     def __contains__(self, key: str) -> bool:
         """Check if key exists"""
         with DatabaseManager() as db:
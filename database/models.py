@@ -13,6 +13,9 @@ import enum
 
 Base = declarative_base()
 
+# Internal (non-customer) roles; seeds use 'claims' while older records may say 'claims_adjuster'
+STAFF_ROLES = frozenset({'admin', 'underwriter', 'claims', 'claims_adjuster', 'accountant'})
+
 
 class PolicyStatus(str, enum.Enum):
     """Policy status enumeration"""
@@ -341,7 +344,7 @@ class User(Base):
     
     def is_staff(self) -> bool:
         """Check if user is internal staff"""
-        return self.role in ('admin', 'underwriter', 'claims_adjuster', 'accountant')
+        return self.role in STAFF_ROLES
 
 
 class Session(Base):
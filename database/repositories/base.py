@@ -17,6 +17,7 @@ Example:
 """
 
 from typing import TypeVar, Generic, List, Optional, Dict, Any
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -150,6 +151,33 @@ class BaseRepository(Generic[T]):
             self.session.rollback()
             return False
     
+    def delete_many(self, id_values: List[Any]) -> int:
+        """
+        Delete several records by primary key in a single statement and commit.
+        
+        Args:
+            id_values: Primary key values
+        
+        Returns:
+            Number of records deleted
+        """
+        if not id_values:
+            return 0
+        try:
+            pk = inspect(self.model_class).primary_key[0]
+            count = (
+                self.session.query(self.model_class)
+                .filter(pk.in_(list(id_values)))
+                .delete(synchronize_session=False)
+            )
+            self.session.commit()
+            logger.info(f"Deleted {count} {self.model_class.__name__} records")
+            return count
+        except SQLAlchemyError as e:
+            logger.error(f"Error bulk deleting {self.model_class.__name__}: {e}")
+            self.session.rollback()
+            return 0
+    
     def count(self) -> int:
         """
         Count total records.
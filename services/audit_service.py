@@ -1,9 +1,13 @@
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from typing import Dict, Any, List
 
+MAX_EVENTS = 5000  # Only the most recent events are kept in memory
+
 class AuditService:
     def __init__(self):
-        self._events: List[Dict[str, Any]] = []
+        self._events: deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
 
     def log(self, actor: str, action: str, entity: str, entity_id: str | int, details: Dict[str, Any] | None = None):
         event = {
@@ -14,10 +18,8 @@ class AuditService:
             'entity_id': entity_id,
             'details': details or {}
         }
+        # The deque drops the oldest entry itself once MAX_EVENTS is reached
         self._events.append(event)
-        # Trim to last 5000 entries to bound memory
-        if len(self._events) > 5000:
-            self._events[:] = self._events[-5000:]
 
     def recent(self, limit: int = 100) -> List[Dict[str, Any]]:
-        return self._events[-limit:]
+        return list(islice(self._events, max(0, len(self._events) - limit), None))
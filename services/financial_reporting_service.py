@@ -74,6 +74,10 @@ INVESTMENT_RETURNS = {
 # Discount rate for present value calculations
 DISCOUNT_RATE = 0.035  # 3.5% annual
 
+# Memoized premium breakdowns keyed by (coverage, age, adl_level, savings_pct, term_years)
+PREMIUM_CACHE_SIZE = 512
+_PREMIUM_CACHE: Dict[Tuple[float, int, int, float, int], Dict[str, float]] = {}
+
 
 class FinancialReportingService:
     """
@@ -125,26 +129,35 @@ class FinancialReportingService:
         
         Returns breakdown of premium components.
         """
+        # Premiums are a pure function of the inputs, so repeat quotes are served from cache
+        cache_key = (coverage, age, adl_level, savings_pct, term_years)
+        cached = _PREMIUM_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         # Base mortality cost (PV of expected death benefit)
         mortality_cost = 0.0
+        adl_mult = self.get_adl_multiplier(adl_level)
+        px_prev = 1.0  # Probability of surviving to the start of the year
+        lapse_survival = 1.0
         for year in range(1, term_years + 1):
             current_age = age + year - 1
             qx = self.get_mortality_rate(current_age)
-            adl_mult = self.get_adl_multiplier(adl_level)
             adjusted_qx = qx * adl_mult
             
             # Probability of surviving to year, then dying
-            px_prev = math.prod([(1 - self.get_mortality_rate(age + y) * self.get_adl_multiplier(adl_level)) 
-                                 for y in range(year - 1)])
             death_prob = px_prev * adjusted_qx
             
             # Lapse-adjusted probability
-            lapse_survival = math.prod([(1 - self.get_lapse_rate(y + 1)) for y in range(year)])
+            lapse_survival *= (1 - self.get_lapse_rate(year))
             adjusted_death_prob = death_prob * lapse_survival
             
             # Discount death benefit to present value
             discount_factor = (1 + DISCOUNT_RATE) ** (-year)
             mortality_cost += coverage * adjusted_death_prob * discount_factor
+
+            # Survival products are carried forward instead of recomputed each year
+            px_prev *= (1 - adjusted_qx)
         
         # Risk premium (mortality cost spread over term)
         risk_premium_annual = mortality_cost / term_years
@@ -159,7 +172,7 @@ class FinancialReportingService:
         # Total annual premium
         total_annual = risk_premium_annual + savings_premium_annual + expense_loading
         
-        return {
+        result = {
             'annual_premium': round(total_annual, 2),
             'monthly_premium': round(total_annual / 12, 2),
             'risk_component': round(risk_premium_annual, 2),
@@ -171,6 +184,10 @@ class FinancialReportingService:
             'adl_level': adl_level,
             'customer_age': age
         }
+        if len(_PREMIUM_CACHE) >= PREMIUM_CACHE_SIZE:
+            _PREMIUM_CACHE.clear()
+        _PREMIUM_CACHE[cache_key] = result
+        return dict(result)
     
     def project_policy_value(self, coverage: float, age: int, adl_level: int,
                             savings_pct: float, term_years: int,
@@ -199,6 +216,9 @@ class FinancialReportingService:
         cumulative_premiums = 0.0
         risk_fund = 0.0
         savings_fund = 0.0
+        growth_factor = 1 + investment_return
+        return_pct = round(investment_return * 100, 2)
+        projection_start = datetime.now()
         
         for year in range(1, term_years + 1):
             current_age = age + year
@@ -208,7 +228,7 @@ class FinancialReportingService:
             risk_fund = risk_fund * (1 - self.get_mortality_rate(current_age - 1)) + risk_component
             
             # Savings fund with investment growth
-            savings_fund = (savings_fund + savings_component) * (1 + investment_return)
+            savings_fund = (savings_fund + savings_component) * growth_factor
             
             # Cash value (surrender value = 85% of savings fund after year 3)
             surrender_penalty = 0.15 if year < 3 else 0.05 if year < 5 else 0.0
@@ -230,8 +250,8 @@ class FinancialReportingService:
                 'death_benefit': round(death_benefit, 2),
                 'adl_claim_benefit': round(adl_claim_payout, 2),
                 'surrender_value': round(cash_value, 2),
-                'investment_return_pct': round(investment_return * 100, 2),
-                'projected_date': (datetime.now() + timedelta(days=365 * year)).strftime('%Y-%m-%d')
+                'investment_return_pct': return_pct,
+                'projected_date': (projection_start + timedelta(days=365 * year)).strftime('%Y-%m-%d')
             })
         
         return projections
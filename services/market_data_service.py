@@ -2,12 +2,30 @@ from __future__ import annotations
 
 import csv
 import io
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 
 import requests
 
+# Stooq serves one ticker per request, so cache misses are fetched concurrently on one
+# process-wide pool. Created on first use; its idle workers keep their per-thread sessions
+# (and upstream connections), and concurrent.futures joins them at interpreter exit.
+INDEX_FETCH_WORKERS = 4
+_index_pool: Optional[ThreadPoolExecutor] = None
+_index_pool_lock = threading.Lock()
+
+
+def _get_index_pool() -> ThreadPoolExecutor:
+    global _index_pool
+    if _index_pool is None:
+        with _index_pool_lock:
+            if _index_pool is None:
+                _index_pool = ThreadPoolExecutor(max_workers=INDEX_FETCH_WORKERS, thread_name_prefix="market-data")
+    return _index_pool
+
 
 @dataclass
 class CachedValue:
@@ -39,6 +57,15 @@ class MarketDataService:
         self._ttl = cache_ttl_seconds
         self._timeout = timeout_seconds
         self._cache: Dict[str, CachedValue] = {}
+        # requests.Session is not thread-safe, so each thread (portal handler or pool worker)
+        # keeps its own, which still reuses upstream connections across that thread's calls
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
 
     def _get_cached(self, key: str) -> Any:
         now = time.time()
@@ -53,7 +80,8 @@ class MarketDataService:
     def get_crypto_prices_usd(self, symbols: List[str]) -> Dict[str, Any]:
         symbols_norm = [s.strip().upper() for s in symbols if s and s.strip()]
         symbols_norm = list(dict.fromkeys(symbols_norm))  # unique preserve order
-        cache_key = f"crypto:{','.join(symbols_norm)}"
+        # Order-insensitive key so "BTC,ETH" and "ETH,BTC" share one cached fetch
+        cache_key = f"crypto:{','.join(sorted(symbols_norm))}"
         cached = self._get_cached(cache_key)
         if cached is not None:
             return cached
@@ -74,7 +102,7 @@ class MarketDataService:
 
         url = "https://api.coingecko.com/api/v3/simple/price"
         params = {"ids": ",".join(ids), "vs_currencies": "usd"}
-        resp = requests.get(url, params=params, timeout=self._timeout)
+        resp = self._session().get(url, params=params, timeout=self._timeout)
         resp.raise_for_status()
         data = resp.json()
 
@@ -96,24 +124,29 @@ class MarketDataService:
         """
         symbols_norm = [s.strip().lower() for s in symbols if s and s.strip()]
         symbols_norm = list(dict.fromkeys(symbols_norm))
-        cache_key = f"index:{','.join(symbols_norm)}"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
 
-        quotes: Dict[str, Any] = {}
-        for s in symbols_norm:
-            url = "https://stooq.com/q/l/"
-            params = {"s": s, "f": "sd2t2ohlcv", "h": "", "e": "csv"}
-            resp = requests.get(url, params=params, timeout=self._timeout)
-            resp.raise_for_status()
-            text = resp.text.strip()
-            reader = csv.DictReader(io.StringIO(text))
-            row = next(reader, None)
-            if not row or row.get("Close") in (None, "", "N/A"):
-                quotes[s] = {"status": "unavailable"}
-                continue
-            quotes[s] = {
+        # Quotes are cached per symbol so overlapping symbol lists only fetch what is missing
+        quotes: Dict[str, Any] = {s: self._get_cached(f"index:{s}") for s in symbols_norm}
+        missing = [s for s, q in quotes.items() if q is None]
+        if len(missing) == 1:
+            quotes[missing[0]] = self._fetch_index_quote(missing[0])
+        elif missing:
+            quotes.update(zip(missing, _get_index_pool().map(self._fetch_index_quote, missing)))
+
+        return {"source": "stooq", "quotes": quotes}
+
+    def _fetch_index_quote(self, symbol: str) -> Dict[str, Any]:
+        url = "https://stooq.com/q/l/"
+        params = {"s": symbol, "f": "sd2t2ohlcv", "h": "", "e": "csv"}
+        resp = self._session().get(url, params=params, timeout=self._timeout)
+        resp.raise_for_status()
+        text = resp.text.strip()
+        reader = csv.DictReader(io.StringIO(text))
+        row = next(reader, None)
+        if not row or row.get("Close") in (None, "", "N/A"):
+            quote = {"status": "unavailable"}
+        else:
+            quote = {
                 "status": "ok",
                 "date": row.get("Date"),
                 "time": row.get("Time"),
@@ -123,8 +156,6 @@ class MarketDataService:
                 "close": row.get("Close"),
                 "volume": row.get("Volume"),
             }
-
-        result = {"source": "stooq", "quotes": quotes}
-        self._set_cached(cache_key, result)
-        return result
+        self._set_cached(f"index:{symbol}", quote)
+        return quote
 
@@ -274,5 +274,34 @@ def test_database_dict_interface():
     assert 'TEST-CUST-400' not in customers
 
 
+
+def test_database_dict_delete_many():
+    """Test bulk deletion through DatabaseDict in a single statement"""
+    from database import init_database
+    from database.data_access import DatabaseDict
+    
+    init_database()
+    
+    customers = DatabaseDict('customers')
+    for i in range(3):
+        customers[f'TEST-CUST-50{i}'] = {
+            'id': f'TEST-CUST-50{i}',
+            'name': f'Bulk Test {i}',
+            'email': f'bulk{i}@test.com'
+        }
+    
+    deleted = customers.delete_many(['TEST-CUST-500', 'TEST-CUST-501', 'NONEXISTENT'])
+    assert deleted == 2
+    assert 'TEST-CUST-500' not in customers
+    assert 'TEST-CUST-501' not in customers
+    assert 'TEST-CUST-502' in customers
+    
+    # Empty input is a no-op
+    assert customers.delete_many([]) == 0
+    
+    # Cleanup
+    del customers['TEST-CUST-502']
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -15,16 +15,32 @@ import os
 import urllib.parse as urlparse
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import sys
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import random
+import re
 import uuid
 import hashlib
 import secrets
 import threading
 import csv
+import functools
+import heapq
+import importlib.util
 import io
+import itertools
+import shutil
+import time
+from operator import itemgetter
 from typing import Dict, Any
 
+# Optional fast JSON encoder for API responses; falls back to the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import billing engine
 try:
     sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -38,11 +54,13 @@ except ImportError:
 # Set USE_DATABASE=false to use volatile in-memory storage (not recommended)
 USE_DATABASE = os.environ.get('USE_DATABASE', 'true').lower() not in ('false', '0', 'no')
 database_enabled = False
+DatabaseManager = None  # Resolved below when database support is available
 
 if USE_DATABASE:
     try:
         from database import init_database, check_database_connection, get_database_info
-        from database.seeds import seed_default_users
+        from database.seeds import seed_default_users, seed_sample_data
+        from database.models import ActuarialTable, Customer, TokenRegistry
         from database.data_access import CUSTOMERS as DB_CUSTOMERS
         from database.data_access import POLICIES as DB_POLICIES
         from database.data_access import CLAIMS as DB_CLAIMS
@@ -50,6 +68,7 @@ if USE_DATABASE:
         from database.data_access import SESSIONS as DB_SESSIONS
         from database.data_access import BILLING as DB_BILLING
         from database.data_access import USERS_DB as DB_USERS
+        from database.manager import DatabaseManager
         
         database_enabled = True
         print("✓ Database persistence enabled (data will survive restarts)")
@@ -63,6 +82,124 @@ else:
 
 PORT = 8000
 ROOT = os.path.join(os.path.dirname(__file__), "static")
+STATIC_CHUNK_SIZE = 64 * 1024  # Read/write buffer when streaming static files
+RESPONSE_COALESCE_LIMIT = 16 * 1024  # Bodies up to this size go out in the same write as the headers
+STATIC_CACHE_MAX_ENTRIES = 128
+STATIC_CACHE_MAX_FILE_SIZE = 1024 * 1024  # Larger files are always streamed from disk
+_STATIC_CACHE: Dict[str, tuple[int, int, bytes]] = {}  # path -> (mtime_ns, size, bytes)
+_STATIC_CACHE_LOCK = threading.Lock()
+STATIC_CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+}
+
+# Status groupings used in membership checks
+CLAIM_PENDING_STATUSES = frozenset({'pending', 'under_review'})
+BILL_OUTSTANDING_STATUSES = frozenset({'outstanding', 'partial'})
+BILL_COLLECTED_STATUSES = frozenset({'paid', 'partial'})
+PORTAL_ROLES = frozenset({'customer', 'admin', 'underwriter', 'claims', 'accountant'})
+
+# Role groups passed to require_role
+ADMIN_ROLES = frozenset({'admin'})
+FINANCE_ROLES = frozenset({'admin', 'accountant'})
+UNDERWRITING_ROLES = frozenset({'admin', 'underwriter'})
+BI_ROLES = frozenset({'admin', 'accountant', 'underwriter'})
+NON_CLAIMS_ROLES = frozenset({'admin', 'accountant', 'underwriter', 'customer'})
+
+# Free-text quote-form fields screened by validate_input_security before anything is stored
+QUOTE_CRITICAL_FIELDS = ('first-name', 'last-name', 'email', 'phone', 'address',
+                         'city', 'state', 'occupation', 'medical-conditions')
+
+# Quote-form answers that raise the risk score in handle_quote_submission
+SMOKER_ANSWERS = frozenset({'yes', 'smoker', 'current'})
+HIGH_RISK_CONDITIONS = ('diabetes', 'heart', 'cancer', 'chronic')  # substrings of the free-text field
+
+# POST endpoints whose auth check does not depend on the body; callers without a
+# valid session/role are turned away before the body is read off the socket
+POST_LOGIN_REQUIRED = frozenset({'/api/change-password', '/api/claims/create'})
+POST_ADMIN_REQUIRED = frozenset({
+    '/api/admin/create-user',
+    '/api/admin/actuarial-tables/upload',
+    '/api/admin/customers/upload',
+    '/api/admin/token-registry',
+    '/api/admin/reset-demo-data',
+})
+
+# Fixed error bodies, encoded once instead of per request
+ERR_UNAUTHORIZED = json.dumps({'error': 'Unauthorized'}).encode('utf-8')
+ERR_ADMIN_REQUIRED = json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8')
+ERR_LOGIN_REQUIRED = json.dumps({'error': 'Unauthorized. Please login.'}).encode('utf-8')
+ERR_FORBIDDEN = json.dumps({'error': 'Forbidden'}).encode('utf-8')
+ERR_INVALID_JSON = json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8')
+ERR_RATE_LIMITED = json.dumps({'error': 'Too many requests. Please try again later.'}).encode('utf-8')
+ERR_IP_BLOCKED = json.dumps({
+    'error': 'Access denied',
+    'message': 'Your IP has been blocked due to suspicious activity'
+}).encode('utf-8')
+ERR_USER_NOT_FOUND = json.dumps({'error': 'User not found'}).encode('utf-8')
+ERR_CUSTOMER_NOT_FOUND = json.dumps({'error': 'Customer not found'}).encode('utf-8')
+ERR_CLAIM_NOT_FOUND = json.dumps({'error': 'Claim not found'}).encode('utf-8')
+ERR_APPLICATION_NOT_FOUND = json.dumps({'error': 'Application not found'}).encode('utf-8')
+ERR_POLICY_NOT_FOUND = json.dumps({'error': 'Policy not found'}).encode('utf-8')
+ERR_BILL_NOT_FOUND = json.dumps({'error': 'Bill not found'}).encode('utf-8')
+ERR_REQUEST_TOO_LARGE = json.dumps({'error': 'Request too large'}).encode('utf-8')
+ERR_INVALID_CREDENTIALS = json.dumps({'error': 'Invalid credentials'}).encode('utf-8')
+ERR_CREDENTIALS_REQUIRED = json.dumps({'error': 'Username and password required'}).encode('utf-8')
+ERR_INVALID_USERNAME = json.dumps({'error': 'Invalid username format'}).encode('utf-8')
+ERR_INTERNAL = json.dumps({'error': 'Internal server error'}).encode('utf-8')
+ERR_INVALID_EMAIL = json.dumps({'error': 'Invalid email format'}).encode('utf-8')
+ERR_PASSWORD_TOO_SHORT = json.dumps({'error': 'Password must be at least 8 characters'}).encode('utf-8')
+ERR_INVALID_COVERAGE = json.dumps({'error': 'Invalid coverage amount'}).encode('utf-8')
+ERR_CUSTOMER_ID_REQUIRED = json.dumps({'error': 'customer_id required'}).encode('utf-8')
+ERR_CUSTOMER_ID_UNAVAILABLE = json.dumps({'error': 'customer_id unavailable'}).encode('utf-8')
+ERR_MARKET_DATA_UNAVAILABLE = json.dumps({'error': 'Market data service unavailable'}).encode('utf-8')
+
+class SessionStore(dict):
+    """In-memory token -> session dict that also indexes tokens by username.
+
+    Holds at most MAX_SESSIONS entries; every session gets the same lifetime, so
+    insertion order is expiry order and the oldest token is evicted first.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._by_user: Dict[str, set[str]] = {}
+
+    def __setitem__(self, token: str, session: Dict[str, Any]) -> None:
+        if token in self:
+            self._unindex(token, dict.__getitem__(self, token))
+        elif len(self) >= MAX_SESSIONS:
+            oldest = next(iter(self))
+            self.pop(oldest)
+            forget_sessions((oldest,))
+        super().__setitem__(token, session)
+        self._by_user.setdefault(session.get('username'), set()).add(token)
+
+    def __delitem__(self, token: str) -> None:
+        self._unindex(token, dict.__getitem__(self, token))
+        super().__delitem__(token)
+
+    def pop(self, token: str, *default: Any) -> Any:
+        if token in self:
+            self._unindex(token, dict.__getitem__(self, token))
+        return super().pop(token, *default)
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_user.clear()
+
+    def _unindex(self, token: str, session: Dict[str, Any]) -> None:
+        username = session.get('username')
+        tokens = self._by_user.get(username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[username]
+
+    def tokens_for(self, username: str) -> list[str]:
+        return list(self._by_user.get(username, ()))
+
 
 # Storage - either database-backed or in-memory
 if USE_DATABASE and database_enabled:
@@ -79,7 +216,7 @@ else:
     CLAIMS: Dict[str, Dict[str, Any]] = {}
     CUSTOMERS: Dict[str, Dict[str, Any]] = {}
     UNDERWRITING_APPLICATIONS: Dict[str, Dict[str, Any]] = {}
-    SESSIONS: Dict[str, Dict[str, Any]] = {}  # token -> {username, expires, customer_id}
+    SESSIONS: Dict[str, Dict[str, Any]] = SessionStore()  # token -> {username, expires, customer_id}
     BILLING: Dict[str, Dict[str, Any]] = {}  # bill_id -> bill data (for metrics)
 try:
     from services.audit_service import AuditService
@@ -124,21 +261,45 @@ try:
 except Exception:
     _market_data = None
 
+# Reporting services used by the dashboard endpoints
+try:
+    from services.financial_reporting_service import FinancialReportingService
+except Exception:
+    FinancialReportingService = None  # type: ignore
+
+try:
+    from services.metrics_service import MetricsService
+except Exception:
+    MetricsService = None  # type: ignore
+
+try:
+    from services.payment_gateway_service import get_payment_gateway
+except ImportError:
+    get_payment_gateway = None  # type: ignore
+
 # Security tracking
 RATE_LIMIT: Dict[str, Dict[str, Any]] = {}  # IP -> {count, reset_time}
 FAILED_LOGINS: Dict[str, Dict[str, Any]] = {}  # IP -> {count, lockout_until}
 BLOCKED_IPS: Dict[str, Dict[str, Any]] = {}  # IP -> {reason, blocked_at, attempts}
-MALICIOUS_ATTEMPTS: list[Dict[str, Any]] = []  # Log of all malicious attempts
+MALICIOUS_ATTEMPTS_MAX = 1000  # Only the most recent attempts are kept in memory
+MALICIOUS_ATTEMPTS: deque[Dict[str, Any]] = deque(maxlen=MALICIOUS_ATTEMPTS_MAX)  # Log of recent malicious attempts
 SUSPICIOUS_PATTERNS: Dict[str, Dict[str, Any]] = {}  # IP -> {pattern_type, count, first_seen}
 MAX_REQUESTS_PER_MINUTE = 60
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_DURATION = 900  # 15 minutes in seconds
 MAX_MALICIOUS_ATTEMPTS = 10  # Permanent block after this many attempts
 MAX_REQUEST_SIZE = 10 * 1024 * 1024  # 10MB max request size
+UNREAD_BODY_DRAIN_LIMIT = 64 * 1024  # Rejected requests up to this size are drained rather than cut off
 SESSION_TIMEOUT = 3600  # 1 hour session timeout
+MAX_SESSIONS = 100000  # In-memory session cap; the oldest session is evicted beyond this
 CONNECTION_TIMEOUT = 30  # 30 seconds connection timeout
 MAX_SESSIONS_PER_IP = 10  # Max concurrent sessions per IP
 CLEANUP_INTERVAL = 300  # Cleanup stale data every 5 minutes
+LISTEN_BACKLOG = 128  # Pending connections the kernel queues while workers are busy (stdlib default is 5)
+
+# The tracking tables above are touched on every request (rate limit, block list), so they
+# get their own lock rather than contending with handlers holding STATE_LOCK
+SECURITY_LOCK = threading.RLock()
 last_cleanup = datetime.now()
 
 # Global lock for in-process shared state (threaded server safety)
@@ -148,30 +309,65 @@ STATE_LOCK = threading.RLock()
 ACTUARIAL_TABLES: Dict[str, Dict[str, Any]] = {}  # table_id -> metadata + encrypted payload
 TOKEN_REGISTRY: Dict[str, Dict[str, Any]] = {}  # entry_id -> token metadata
 
+# PBKDF2 work factor. Stored hashes (including database/seeds.py) carry no iteration count,
+# so changing this invalidates every existing password.
+PASSWORD_HASH_ITERATIONS = 100000
+
 # Hash passwords for security (in production, use proper password hashing)
 def hash_password(password: str) -> dict[str, str]:
     salt = secrets.token_hex(16)
-    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
+    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PASSWORD_HASH_ITERATIONS)
     return {'hash': hashed.hex(), 'salt': salt}
 
 def verify_password(password: str, stored_hash: str, salt: str) -> bool:
-    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
+    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PASSWORD_HASH_ITERATIONS)
     return secrets.compare_digest(hashed.hex(), stored_hash)
 
+# Verified against when a login names an unknown user, so the KDF runs either way
+# and response time does not reveal whether the account exists
+_DUMMY_PASSWORD = {'hash': '0' * 64, 'salt': secrets.token_hex(16)}
+
+def user_session_tokens(username: str) -> list[str]:
+    """Tokens of every stored session belonging to username (without walking all sessions)"""
+    if isinstance(SESSIONS, SessionStore):
+        return SESSIONS.tokens_for(username)
+    with DatabaseManager() as db:
+        return [s.token for s in db.sessions.get_by_username(username)]
+
+# Recently validated sessions, so repeated requests on one token skip the store lookup
+# (a DB round trip when database-backed) and the expiry parse. Entries never outlive the
+# session itself; every code path that deletes a session also calls forget_sessions().
+VALIDATED_SESSION_TTL = 30  # seconds
+VALIDATED_SESSION_CACHE_MAX = 4096
+_VALIDATED_SESSIONS: Dict[str, tuple[float, dict[str, str]]] = {}  # token -> (deadline, session)
+
+def forget_sessions(tokens) -> None:
+    """Drop tokens from the validated-session cache (call whenever sessions are deleted)"""
+    with STATE_LOCK:
+        for token in tokens:
+            _VALIDATED_SESSIONS.pop(token, None)
+
 def validate_session(token: str) -> dict[str, str] | None:
     """Validate session token and return user info or None"""
     if not token or not token.startswith('phins_'):
         return None
 
+    now = time.monotonic()
     with STATE_LOCK:
+        cached = _VALIDATED_SESSIONS.get(token)
+        if cached is not None:
+            if cached[0] > now:
+                return cached[1]
+            del _VALIDATED_SESSIONS[token]
+
         session = SESSIONS.get(token)
         if not session:
             return None
 
         # Check if session expired
         try:
-            expires = datetime.fromisoformat(session['expires'])
-            if datetime.now() > expires:
+            remaining = (datetime.fromisoformat(session['expires']) - datetime.now()).total_seconds()
+            if remaining < 0:
                 try:
                     del SESSIONS[token]
                 except Exception:
@@ -181,13 +377,16 @@ def validate_session(token: str) -> dict[str, str] | None:
         except (KeyError, ValueError):
             return None
 
+        if len(_VALIDATED_SESSIONS) >= VALIDATED_SESSION_CACHE_MAX:
+            _VALIDATED_SESSIONS.pop(next(iter(_VALIDATED_SESSIONS)))
+        _VALIDATED_SESSIONS[token] = (now + min(VALIDATED_SESSION_TTL, remaining), session)
         return session
 
 def check_rate_limit(client_ip: str) -> bool:
     """Check if client has exceeded rate limit"""
     now = datetime.now().timestamp()
 
-    with STATE_LOCK:
+    with SECURITY_LOCK:
         if client_ip in RATE_LIMIT:
             limit_data = RATE_LIMIT[client_ip]
             # Reset counter if minute has passed
@@ -205,9 +404,9 @@ def check_rate_limit(client_ip: str) -> bool:
 
 def check_login_lockout(client_ip: str) -> bool:
     """Check if IP is locked out due to failed login attempts"""
-    with STATE_LOCK:
-        if client_ip in FAILED_LOGINS:
-            lockout_data = FAILED_LOGINS[client_ip]
+    with SECURITY_LOCK:
+        lockout_data = FAILED_LOGINS.get(client_ip)
+        if lockout_data is not None:
             if datetime.now().timestamp() < lockout_data.get('lockout_until', 0):
                 return False  # Still locked out
             elif lockout_data['count'] >= MAX_LOGIN_ATTEMPTS:
@@ -217,16 +416,13 @@ def check_login_lockout(client_ip: str) -> bool:
 
 def record_failed_login(client_ip: str):
     """Record a failed login attempt"""
-    with STATE_LOCK:
-        if client_ip not in FAILED_LOGINS:
-            FAILED_LOGINS[client_ip] = {'count': 0}
+    with SECURITY_LOCK:
+        entry = FAILED_LOGINS.setdefault(client_ip, {'count': 0})
+        entry['count'] += 1
+        if entry['count'] >= MAX_LOGIN_ATTEMPTS:
+            entry['lockout_until'] = datetime.now().timestamp() + LOCKOUT_DURATION
 
-        FAILED_LOGINS[client_ip]['count'] += 1
-
-        if FAILED_LOGINS[client_ip]['count'] >= MAX_LOGIN_ATTEMPTS:
-            FAILED_LOGINS[client_ip]['lockout_until'] = datetime.now().timestamp() + LOCKOUT_DURATION
-
-def require_role(session: dict[str, str] | None, allowed_roles: list[str]) -> bool:
+def require_role(session: dict[str, str] | None, allowed_roles: frozenset[str]) -> bool:
     """Check if user has required role"""
     if not session:
         return False
@@ -260,13 +456,10 @@ def log_malicious_attempt(client_ip: str, reason: str, details: Dict[str, Any] |
         'reason': reason,
         'details': details or {}
     }
-    with STATE_LOCK:
+    with SECURITY_LOCK:
+        # Bounded deque: the oldest attempt falls off in O(1) once the cap is reached
         MALICIOUS_ATTEMPTS.append(attempt)
 
-        # Keep only last 1000 attempts in memory
-        if len(MALICIOUS_ATTEMPTS) > 1000:
-            MALICIOUS_ATTEMPTS.pop(0)
-
         # Check if IP should be permanently blocked
         ip_attempts = sum(1 for a in MALICIOUS_ATTEMPTS if a['ip'] == client_ip)
         if ip_attempts >= MAX_MALICIOUS_ATTEMPTS:
@@ -279,7 +472,7 @@ def log_malicious_attempt(client_ip: str, reason: str, details: Dict[str, Any] |
 
 def block_ip(client_ip: str, reason: str, permanent: bool = False):
     """Block an IP address"""
-    with STATE_LOCK:
+    with SECURITY_LOCK:
         BLOCKED_IPS[client_ip] = {
             'reason': reason,
             'blocked_at': datetime.now().isoformat(),
@@ -290,7 +483,7 @@ def block_ip(client_ip: str, reason: str, permanent: bool = False):
 
 def is_ip_blocked(client_ip: str) -> tuple[bool, str]:
     """Check if IP is blocked, returns (is_blocked, reason)"""
-    with STATE_LOCK:
+    with SECURITY_LOCK:
         if client_ip in BLOCKED_IPS:
             block_data = BLOCKED_IPS[client_ip]
             if block_data.get('permanent'):
@@ -303,63 +496,66 @@ def is_ip_blocked(client_ip: str) -> tuple[bool, str]:
                 del BLOCKED_IPS[client_ip]
         return (False, "")
 
+# Detector patterns, pre-cased once so each check is a plain substring scan
+SQL_INJECTION_PATTERNS = tuple(p.upper() for p in (
+    "' OR '", '" OR "', "1=1", "1' OR '1", 'DROP TABLE', 'DELETE FROM',
+    'INSERT INTO', 'UPDATE ', 'UNION SELECT', '--', '/*', '*/', 'xp_',
+    'sp_', 'EXEC ', 'EXECUTE', ';--', "';--", '";--'
+))
+XSS_PATTERNS = (
+    '<script', '</script>', 'javascript:', 'onerror=', 'onload=',
+    'onclick=', 'onmouseover=', '<iframe', '<object', '<embed',
+    'eval(', 'alert(', 'document.cookie', 'window.location'
+)
+PATH_TRAVERSAL_PATTERNS = ('../', '..\\', '%2e%2e', '%252e%252e', '/etc/passwd', '/etc/shadow')
+COMMAND_INJECTION_PATTERNS = ('&&', '||', ';', '|', '`', '$(', 'system(', 'exec(', 'shell_exec', 'passthru',
+                              'wget', 'curl', 'nc ', 'netcat', '/bin/', '/dev/', 'chmod', 'chown')
+MALICIOUS_PAYLOAD_PATTERNS = tuple(p.lower() for p in (
+    # Code execution
+    'eval(', 'exec(', '__import__', 'compile(', 'globals()',
+    # File operations
+    'open(', 'file(', 'read(', 'write(',
+    # System access
+    'os.system', 'subprocess', 'popen', 'pty.spawn',
+    # Reverse shells
+    'socket', 'connect(', 'bind(', 'listen(',
+    # Crypto mining
+    'crypto', 'mining', 'monero', 'bitcoin',
+    # Data exfiltration
+    'base64', 'pickle', 'marshal', 'shelve',
+    # LDAP injection
+    '(|', '(&', '(!(', '*)(', ')(&',
+    # XML injection
+    '<!ENTITY', '<!DOCTYPE', 'SYSTEM \"',
+    # SSRF
+    'file://', 'gopher://', 'dict://', 'ftp://', 'tftp://',
+    # Template injection
+    '{{', '{%', '<%', '#{', '@{'
+))
+
 def detect_sql_injection(value: str) -> bool:
     """Detect potential SQL injection attempts"""
-    sql_patterns = [
-        "' OR '", '" OR "', "1=1", "1' OR '1", 'DROP TABLE', 'DELETE FROM',
-        'INSERT INTO', 'UPDATE ', 'UNION SELECT', '--', '/*', '*/', 'xp_',
-        'sp_', 'EXEC ', 'EXECUTE', ';--', "';--", '";--'
-    ]
     value_upper = value.upper()
-    return any(pattern.upper() in value_upper for pattern in sql_patterns)
+    return any(pattern in value_upper for pattern in SQL_INJECTION_PATTERNS)
 
 def detect_xss_attempt(value: str) -> bool:
     """Detect potential XSS (Cross-Site Scripting) attempts"""
-    xss_patterns = [
-        '<script', '</script>', 'javascript:', 'onerror=', 'onload=',
-        'onclick=', 'onmouseover=', '<iframe', '<object', '<embed',
-        'eval(', 'alert(', 'document.cookie', 'window.location'
-    ]
     value_lower = value.lower()
-    return any(pattern.lower() in value_lower for pattern in xss_patterns)
+    return any(pattern in value_lower for pattern in XSS_PATTERNS)
 
 def detect_path_traversal(value: str) -> bool:
     """Detect path traversal attempts"""
-    patterns = ['../', '..\\', '%2e%2e', '%252e%252e', '/etc/passwd', '/etc/shadow']
-    return any(pattern in value.lower() for pattern in patterns)
+    value_lower = value.lower()
+    return any(pattern in value_lower for pattern in PATH_TRAVERSAL_PATTERNS)
 
 def detect_command_injection(value: str) -> bool:
     """Detect command injection attempts"""
-    patterns = ['&&', '||', ';', '|', '`', '$(', 'system(', 'exec(', 'shell_exec', 'passthru', 
-                'wget', 'curl', 'nc ', 'netcat', '/bin/', '/dev/', 'chmod', 'chown']
-    return any(pattern in value for pattern in patterns)
+    return any(pattern in value for pattern in COMMAND_INJECTION_PATTERNS)
 
 def detect_malicious_payload(value: str) -> bool:
     """Detect various malicious payloads and exploits"""
-    malicious_patterns = [
-        # Code execution
-        'eval(', 'exec(', '__import__', 'compile(', 'globals()',
-        # File operations
-        'open(', 'file(', 'read(', 'write(',
-        # System access
-        'os.system', 'subprocess', 'popen', 'pty.spawn',
-        # Reverse shells
-        'socket', 'connect(', 'bind(', 'listen(',
-        # Crypto mining
-        'crypto', 'mining', 'monero', 'bitcoin',
-        # Data exfiltration 
-        'base64', 'pickle', 'marshal', 'shelve',
-        # LDAP injection
-        '(|', '(&', '(!(', '*)(', ')(&',
-        # XML injection
-        '<!ENTITY', '<!DOCTYPE', 'SYSTEM \"',
-        # SSRF
-        'file://', 'gopher://', 'dict://', 'ftp://', 'tftp://',
-        # Template injection
-        '{{', '{%', '<%', '#{', '@{'
-    ]
     value_lower = value.lower()
-    return any(pattern.lower() in value_lower for pattern in malicious_patterns)
+    return any(pattern in value_lower for pattern in MALICIOUS_PAYLOAD_PATTERNS)
 
 def cleanup_stale_data():
     """Clean up expired sessions, old rate limits, and stale security data"""
@@ -377,12 +573,21 @@ def cleanup_stale_data():
         # Clean expired sessions
         expired_sessions = [token for token, sess in SESSIONS.items()
                            if datetime.fromisoformat(sess['expires']) < now]
-        for token in expired_sessions:
+        forget_sessions(expired_sessions)
+        if hasattr(SESSIONS, 'delete_many'):
+            # Database-backed store: remove every expired session in one statement
             try:
-                del SESSIONS[token]
+                SESSIONS.delete_many(expired_sessions)
             except Exception:
                 pass
+        else:
+            for token in expired_sessions:
+                try:
+                    del SESSIONS[token]
+                except Exception:
+                    pass
 
+    with SECURITY_LOCK:
         # Clean expired rate limits
         expired_limits = [ip for ip, data in RATE_LIMIT.items()
                          if timestamp > data['reset_time'] + 300]  # 5 min grace
@@ -401,10 +606,6 @@ def cleanup_stale_data():
                          (now - datetime.fromisoformat(data['blocked_at'])).total_seconds() > 86400]
         for ip in expired_blocks:
             del BLOCKED_IPS[ip]
-
-        # Trim malicious attempts log to last 1000
-        if len(MALICIOUS_ATTEMPTS) > 1000:
-            MALICIOUS_ATTEMPTS[:] = MALICIOUS_ATTEMPTS[-1000:]
     
     if expired_sessions or expired_limits or expired_lockouts or expired_blocks:
         print(f"🧹 Cleanup: Removed {len(expired_sessions)} sessions, {len(expired_limits)} rate limits, "
@@ -418,65 +619,68 @@ def check_session_limit(client_ip: str) -> bool:
                              datetime.fromisoformat(sess['expires']) > datetime.now())
         return active_sessions < MAX_SESSIONS_PER_IP
 
+# Threat kind -> (attempt type logged, block reason, permanent block, log a length+sample rather than the value)
+INPUT_THREATS: Dict[str, tuple[str, str, bool, bool]] = {
+    'sql': ('SQL Injection Attempt', 'SQL Injection detected', False, True),
+    'xss': ('XSS Attempt', 'XSS attack detected', False, True),
+    'path': ('Path Traversal Attempt', 'Path traversal detected', False, False),
+    'command': ('Command Injection Attempt', 'Command injection detected', False, False),
+    'payload': ('Malicious Payload Detected', 'Malicious code detected', True, True),
+}
+
+# Only values this short are memoized: cache keys are client-supplied and held strongly,
+# so caching long ones would let a client pin up to 4096 request-sized strings
+THREAT_MEMO_MAX_LENGTH = 256
+
+def classify_input_threat(value: str) -> str | None:
+    """First INPUT_THREATS kind the detectors flag in value, or None. Repeated short
+    form values (city, occupation, ...) are answered from a cache."""
+    if len(value) <= THREAT_MEMO_MAX_LENGTH:
+        return _classify_short_input(value)
+    return _detect_input_threat(value)
+
+def _detect_input_threat(value: str) -> str | None:
+    if detect_sql_injection(value):
+        return 'sql'
+    if detect_xss_attempt(value):
+        return 'xss'
+    if detect_path_traversal(value):
+        return 'path'
+    if detect_command_injection(value):
+        return 'command'
+    if detect_malicious_payload(value):
+        return 'payload'
+    return None
+
+_classify_short_input = functools.lru_cache(maxsize=4096)(_detect_input_threat)
+
 def validate_input_security(value: str, client_ip: str, field_name: str = 'input') -> tuple[bool, str | None]:
     """Comprehensive input validation, returns (is_valid, error_message)"""
     if not value:
         return (True, None)
     
     value_str = str(value)
+    threat = classify_input_threat(value_str)
+    if threat is None:
+        return (True, None)
     
-    # Check for SQL injection
-    if detect_sql_injection(value_str):
-        log_malicious_attempt(client_ip, 'SQL Injection Attempt', {
-            'field': field_name,
-            'value_length': len(value_str),
-            'sample': value_str[:100]
-        })
-        block_ip(client_ip, 'SQL Injection detected', permanent=False)
-        return (False, 'Invalid input detected')
-    
-    # Check for XSS
-    if detect_xss_attempt(value_str):
-        log_malicious_attempt(client_ip, 'XSS Attempt', {
-            'field': field_name,
-            'value_length': len(value_str),
-            'sample': value_str[:100]
-        })
-        block_ip(client_ip, 'XSS attack detected', permanent=False)
-        return (False, 'Invalid input detected')
-    
-    # Check for path traversal
-    if detect_path_traversal(value_str):
-        log_malicious_attempt(client_ip, 'Path Traversal Attempt', {
-            'field': field_name,
-            'value': value_str[:100]
-        })
-        block_ip(client_ip, 'Path traversal detected', permanent=False)
-        return (False, 'Invalid input detected')
-    
-    # Check for command injection
-    if detect_command_injection(value_str):
-        log_malicious_attempt(client_ip, 'Command Injection Attempt', {
-            'field': field_name,
-            'value': value_str[:100]
-        })
-        block_ip(client_ip, 'Command injection detected', permanent=False)
-        return (False, 'Invalid input detected')
-    
-    # Check for malicious payloads
-    if detect_malicious_payload(value_str):
-        log_malicious_attempt(client_ip, 'Malicious Payload Detected', {
-            'field': field_name,
-            'value_length': len(value_str),
-            'sample': value_str[:100]
-        })
-        block_ip(client_ip, 'Malicious code detected', permanent=True)
-        return (False, 'Invalid input detected')
-    
-    return (True, None)
-
-def sanitize_input(value: str, max_length: int = 255) -> str:
-    """Sanitize user input to prevent injection attacks"""
+    # Logging and blocking are per request, never cached
+    attempt_type, block_reason, permanent, sample_only = INPUT_THREATS[threat]
+    if sample_only:
+        details = {'field': field_name, 'value_length': len(value_str), 'sample': value_str[:100]}
+    else:
+        details = {'field': field_name, 'value': value_str[:100]}
+    log_malicious_attempt(client_ip, attempt_type, details)
+    block_ip(client_ip, block_reason, permanent=permanent)
+    return (False, 'Invalid input detected')
+
+# Characters stripped by sanitize_input(), removed in a single translate() pass;
+# the lowering variant also folds ASCII upper case in that same pass
+_SANITIZE_TABLE = str.maketrans('', '', '<>"\'\\\x00\n\r\t')
+_SANITIZE_LOWER_TABLE = {**_SANITIZE_TABLE, **{ord(c): c.lower() for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'}}
+
+def sanitize_input(value: str, max_length: int = 255, lower: bool = False) -> str:
+    """Sanitize user input to prevent injection attacks (optionally lower-cased)"""
     if not value:
         return ''
     
@@ -484,17 +688,21 @@ def sanitize_input(value: str, max_length: int = 255) -> str:
     value = str(value)[:max_length]
     
     # Remove potentially dangerous characters
-    dangerous_chars = ['<', '>', '"', "'", '\\', '\x00', '\n', '\r', '\t']
-    for char in dangerous_chars:
-        value = value.replace(char, '')
-    
-    return value.strip()
+    if not lower:
+        return value.translate(_SANITIZE_TABLE).strip()
+    if value.isascii():
+        return value.translate(_SANITIZE_LOWER_TABLE).strip()
+    return value.translate(_SANITIZE_TABLE).strip().lower()
+
+# Both patterns backtrack quadratically on long dotted domains, so callers check
+# MAX_EMAIL_LENGTH first and the regex only ever sees bounded input
+MAX_EMAIL_LENGTH = 254
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+LOOSE_EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')  # /api/validate-email's looser check
 
 def validate_email(email: str) -> bool:
     """Basic email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email)) and len(email) <= 254
+    return len(email) <= MAX_EMAIL_LENGTH and EMAIL_PATTERN.match(email) is not None
 
 def validate_amount(amount: Any) -> bool:
     """Validate monetary amounts"""
@@ -512,7 +720,6 @@ if USE_DATABASE and database_enabled:
         """Wrapper to make database users work like a dict"""
         def get(self, username: str, default=None):
             try:
-                from database.manager import DatabaseManager
                 with DatabaseManager() as db:
                     user = db.users.get_by_username(username)
                     if user:
@@ -547,49 +754,67 @@ else:
     }
 
 
+# Default allocations for the mock statement; identical for every customer so build them once
+MOCK_STATEMENT_ALLOCATIONS = (
+    {"allocation_id": "ALLOC-000001", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
+    {"allocation_id": "ALLOC-000002", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
+    {"allocation_id": "ALLOC-000003", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
+)
+
+
 def get_mock_statement(customer_id: str) -> Dict[str, Any]:
     return {
         "customer_id": customer_id,
         "total_premium": 300.0,
         "risk_total": 225.0,
         "savings_total": 75.0,
-        "allocations": [
-            {"allocation_id": "ALLOC-000001", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
-            {"allocation_id": "ALLOC-000002", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
-            {"allocation_id": "ALLOC-000003", "amount": 100.0, "risk_amount": 75.0, "savings_amount": 25.0},
-        ],
+        "allocations": list(MOCK_STATEMENT_ALLOCATIONS),
     }
 
 
+def id_suffix() -> str:
+    """Random part of generated record IDs (32 bits from the OS RNG, so collisions are negligible)"""
+    return secrets.token_hex(4).upper()
+
 def generate_policy_id() -> str:
-    return f"POL-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+    return f"POL-{datetime.now().strftime('%Y%m%d')}-{id_suffix()}"
 
 def generate_claim_id() -> str:
-    return f"CLM-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+    return f"CLM-{datetime.now().strftime('%Y%m%d')}-{id_suffix()}"
 
 def generate_customer_id() -> str:
-    return f"CUST-{random.randint(10000, 99999)}"
+    return f"CUST-{id_suffix()}"
+
+PREMIUM_CACHE_SIZE = 4096
+
 
 def calculate_premium(policy_data: Dict[str, Any]) -> Dict[str, float]:
     """Calculate premium based on policy type and customer data"""
+    return dict(_premium_for(
+        policy_data.get('type', 'life'),
+        policy_data.get('age', 30),
+        policy_data.get('coverage_amount', 100000),
+        policy_data.get('risk_score', 'medium'),
+    ))
+
+@functools.lru_cache(maxsize=PREMIUM_CACHE_SIZE)
+def _premium_for(policy_type: Any, age: Any, coverage: Any, risk_score: Any) -> Dict[str, float]:
+    """Pure pricing for one input shape; quotes repeat the same tiers, so results are memoized"""
     base_premium = {
         'life': 1200,
         'health': 800,
         'auto': 600,
         'property': 1500,
         'business': 3000
-    }.get(policy_data.get('type', 'life'), 1000)
+    }.get(policy_type, 1000)
     
     # Age factor
-    age = policy_data.get('age', 30)
     age_factor = 1.0 + (max(0, age - 25) * 0.02)
     
     # Coverage factor
-    coverage = policy_data.get('coverage_amount', 100000)
     coverage_factor = coverage / 100000
     
     # Risk factor based on underwriting
-    risk_score = policy_data.get('risk_score', 'medium')
     risk_factors = {'low': 0.8, 'medium': 1.0, 'high': 1.3, 'very_high': 1.6}
     risk_factor = risk_factors.get(risk_score, 1.0)
     
@@ -600,6 +825,43 @@ def calculate_premium(policy_data: Dict[str, Any]) -> Dict[str, float]:
         'quarterly': round(annual_premium / 4, 2)
     }
 
+POLICY_TERM = timedelta(days=365)
+
+def create_pending_policy(customer_id: str, policy_type: str, coverage_amount: Any, risk_score: str,
+                          premium_data: Dict[str, float], now: datetime, application: Dict[str, Any] | None = None,
+                          start_date: str | None = None, end_date: str | None = None) -> Dict[str, Any]:
+    """Store a new policy awaiting underwriting plus its pending application; returns the policy"""
+    now_iso = now.isoformat()
+    day = now.strftime('%Y%m%d')
+    policy_id = f"POL-{day}-{id_suffix()}"
+    uw_id = f"UW-{day}-{id_suffix()}"
+    uw_app = {
+        'id': uw_id,
+        'policy_id': policy_id,
+        'customer_id': customer_id,
+        'status': 'pending',
+        'risk_assessment': risk_score,
+        **(application or {}),
+        'submitted_date': now_iso
+    }
+    policy = {
+        'id': policy_id,
+        'customer_id': customer_id,
+        'type': policy_type,
+        'coverage_amount': coverage_amount,
+        'annual_premium': premium_data['annual'],
+        'monthly_premium': premium_data['monthly'],
+        'status': 'pending_underwriting',
+        'underwriting_id': uw_id,
+        'risk_score': risk_score,
+        'start_date': start_date or now_iso,
+        'end_date': end_date or (now + POLICY_TERM).isoformat(),
+        'created_date': now_iso
+    }
+    UNDERWRITING_APPLICATIONS[uw_id] = uw_app
+    POLICIES[policy_id] = policy
+    return policy
+
 def get_bi_data_actuary() -> Dict[str, Any]:
     """Generate actuarial BI data"""
     # Best-effort include actuarial upload state (table governance signal)
@@ -607,32 +869,33 @@ def get_bi_data_actuary() -> Dict[str, Any]:
     latest_uploaded = None
     try:
         if ACTUARIAL_TABLES:
-            latest_uploaded = sorted(
-                ACTUARIAL_TABLES.values(),
-                key=lambda x: x.get('created_date', ''),
-                reverse=True
-            )[0].get('created_date')
+            latest_uploaded = max(ACTUARIAL_TABLES.values(), key=itemgetter('created_date'))['created_date']
     except Exception:
         latest_uploaded = None
 
+    # Single pass over policies for every aggregate below
+    total_exposure = 0
+    total_premium = 0
+    risk_distribution = {'low': 0, 'medium': 0, 'high': 0, 'very_high': 0}
+    policy_by_type = {'life': 0, 'health': 0, 'auto': 0, 'property': 0}
+    for p in POLICIES.values():
+        total_exposure += p.get('coverage_amount', 0)
+        total_premium += p.get('annual_premium', 0)
+        risk = p.get('risk_score')
+        if risk in risk_distribution:
+            risk_distribution[risk] += 1
+        ptype = p.get('type')
+        if ptype in policy_by_type:
+            policy_by_type[ptype] += 1
+
     return {
         'total_policies': len(POLICIES),
-        'total_exposure': sum(p.get('coverage_amount', 0) for p in POLICIES.values()),
-        'average_premium': sum(p.get('annual_premium', 0) for p in POLICIES.values()) / max(len(POLICIES), 1),
-        'risk_distribution': {
-            'low': sum(1 for p in POLICIES.values() if p.get('risk_score') == 'low'),
-            'medium': sum(1 for p in POLICIES.values() if p.get('risk_score') == 'medium'),
-            'high': sum(1 for p in POLICIES.values() if p.get('risk_score') == 'high'),
-            'very_high': sum(1 for p in POLICIES.values() if p.get('risk_score') == 'very_high')
-        },
+        'total_exposure': total_exposure,
+        'average_premium': total_premium / max(len(POLICIES), 1),
+        'risk_distribution': risk_distribution,
         'claims_ratio': len(CLAIMS) / max(len(POLICIES), 1),
-        'loss_ratio': sum(c.get('approved_amount', 0) for c in CLAIMS.values() if c.get('status') == 'paid') / max(sum(p.get('annual_premium', 0) for p in POLICIES.values()), 1),
-        'policy_by_type': {
-            'life': sum(1 for p in POLICIES.values() if p.get('type') == 'life'),
-            'health': sum(1 for p in POLICIES.values() if p.get('type') == 'health'),
-            'auto': sum(1 for p in POLICIES.values() if p.get('type') == 'auto'),
-            'property': sum(1 for p in POLICIES.values() if p.get('type') == 'property')
-        },
+        'loss_ratio': sum(c.get('approved_amount', 0) for c in CLAIMS.values() if c.get('status') == 'paid') / max(total_premium, 1),
+        'policy_by_type': policy_by_type,
         'actuarial_tables': {
             'count': actuarial_count,
             'latest_uploaded': latest_uploaded
@@ -641,18 +904,30 @@ def get_bi_data_actuary() -> Dict[str, Any]:
 
 def get_bi_data_underwriting() -> Dict[str, Any]:
     """Generate underwriting BI data"""
+    this_month = datetime.now().strftime('%Y-%m')
+    pending = approved_this_month = rejected = exams_required = 0
+    risk_distribution = {'low': 0, 'medium': 0, 'high': 0, 'very_high': 0}
+    for u in UNDERWRITING_APPLICATIONS.values():
+        status = u.get('status')
+        if status == 'pending':
+            pending += 1
+        elif status == 'approved' and u.get('decision_date', '').startswith(this_month):
+            approved_this_month += 1
+        elif status == 'rejected':
+            rejected += 1
+        risk = u.get('risk_assessment')
+        if risk in risk_distribution:
+            risk_distribution[risk] += 1
+        if u.get('medical_exam_required', False):
+            exams_required += 1
+
     return {
-        'pending_applications': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('status') == 'pending'),
-        'approved_this_month': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('status') == 'approved' and u.get('decision_date', '').startswith(datetime.now().strftime('%Y-%m'))),
-        'rejection_rate': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('status') == 'rejected') / max(len(UNDERWRITING_APPLICATIONS), 1),
+        'pending_applications': pending,
+        'approved_this_month': approved_this_month,
+        'rejection_rate': rejected / max(len(UNDERWRITING_APPLICATIONS), 1),
         'average_processing_time': 3.5,  # days
-        'risk_assessment_distribution': {
-            'low': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('risk_assessment') == 'low'),
-            'medium': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('risk_assessment') == 'medium'),
-            'high': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('risk_assessment') == 'high'),
-            'very_high': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('risk_assessment') == 'very_high')
-        },
-        'medical_exams_required': sum(1 for u in UNDERWRITING_APPLICATIONS.values() if u.get('medical_exam_required', False))
+        'risk_assessment_distribution': risk_distribution,
+        'medical_exams_required': exams_required
     }
 
 def get_bi_data_accounting() -> Dict[str, Any]:
@@ -665,7 +940,7 @@ def get_bi_data_accounting() -> Dict[str, Any]:
         'total_claims_paid': total_claims_paid,
         'net_income': total_premium_collected - total_claims_paid,
         'outstanding_premiums': sum(p.get('annual_premium', 0) * 0.1 for p in POLICIES.values()),  # Mock 10% outstanding
-        'pending_claims_liability': sum(c.get('claimed_amount', 0) for c in CLAIMS.values() if c.get('status') in ['pending', 'under_review']),
+        'pending_claims_liability': sum(c.get('claimed_amount', 0) for c in CLAIMS.values() if c.get('status') in CLAIM_PENDING_STATUSES),
         'profit_margin': ((total_premium_collected - total_claims_paid) / max(total_premium_collected, 1)) * 100,
         'monthly_breakdown': [
             {'month': (datetime.now() - timedelta(days=30*i)).strftime('%Y-%m'), 
@@ -675,16 +950,85 @@ def get_bi_data_accounting() -> Dict[str, Any]:
         ][::-1]
     }
 
+
+def json_bytes(obj: Any, default: Any = None) -> bytes:
+    """Encode obj as UTF-8 JSON bytes, using orjson when it is installed.
+
+    Payloads given a default always use the stdlib encoder: orjson serializes datetimes,
+    dataclasses, enums and NaN itself without calling default, so those responses would
+    change format depending on whether orjson is present.
+    """
+    if orjson is not None and default is None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles them
+    return json.dumps(obj, default=default).encode('utf-8')
+
+
+def json_loads(data: bytes | str) -> Any:
+    """Parse a JSON request body, using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. integers beyond 64 bits or non-UTF-8 encodings; let the stdlib decide
+    return json.loads(data)
+
+
+_ACCOUNTING_ENGINE = None
+_ACCOUNTING_ENGINE_LOCK = threading.Lock()
+
+
+def get_accounting_engine() -> Any:
+    """Shared AccountingEngine for the read-only disclaimer/portfolio/statement endpoints"""
+    global _ACCOUNTING_ENGINE
+    if _ACCOUNTING_ENGINE is None:
+        with _ACCOUNTING_ENGINE_LOCK:
+            if _ACCOUNTING_ENGINE is None:
+                from accounting_engine import AccountingEngine
+                _ACCOUNTING_ENGINE = AccountingEngine()
+    return _ACCOUNTING_ENGINE
+
+
+@functools.lru_cache(maxsize=128)
+def get_disclaimers_json(action: str | None, disc_type: str | None) -> bytes:
+    """Encoded /api/disclaimers payload; disclaimers are fixed for the engine's lifetime"""
+    from accounting_engine import DisclaimerType
+    engine = get_accounting_engine()
+
+    if action:
+        disclaimers = engine.get_all_disclaimers_for_action(action)
+    elif disc_type:
+        # Try to match the type
+        try:
+            disc = engine.get_disclaimer(DisclaimerType[disc_type])
+            disclaimers = [disc] if disc else []
+        except (KeyError, AttributeError):
+            disclaimers = []
+    else:
+        disclaimers = engine.get_all_disclaimers()
+
+    return json_bytes({'disclaimers': [
+        {
+            'type': d.disclaimer_type.name if hasattr(d.disclaimer_type, 'name') else str(d.disclaimer_type),
+            'title': d.title,
+            'content': d.content,
+            'version': d.version,
+            'effective_date': str(d.effective_date)
+        }
+        for d in disclaimers if d
+    ]})
+
+
 def try_get_statement_from_engine(customer_id: str) -> Any:
     try:
-        import accounting_engine as ae
-
-        engine = ae.AccountingEngine()
+        engine = get_accounting_engine()
         # Try to call a best-effort method and coerce result to JSON-serializable
         if hasattr(engine, "get_customer_statement"):
             stmt = engine.get_customer_statement(customer_id)  # type: ignore
             try:
-                result: Any = json.loads(json.dumps(stmt, default=lambda o: o.__dict__))
+                result: Any = json_loads(json_bytes(stmt, default=lambda o: o.__dict__))
                 return result
             except Exception:
                 return stmt  # type: ignore
@@ -693,33 +1037,138 @@ def try_get_statement_from_engine(customer_id: str) -> Any:
     return None
 
 
+_CONNECTORS_MODULE = None
+_CONNECTORS_LOCK = threading.Lock()
+
+
+def load_connectors() -> Any:
+    """Load connectors.py by file location once and reuse the module afterwards"""
+    global _CONNECTORS_MODULE
+    if _CONNECTORS_MODULE is None:
+        with _CONNECTORS_LOCK:
+            if _CONNECTORS_MODULE is None:
+                # Load by file location to support running server.py directly
+                conn_path = os.path.join(os.path.dirname(__file__), 'connectors.py')
+                spec = importlib.util.spec_from_file_location('web_portal.connectors', conn_path)
+                if not (spec and spec.loader):
+                    raise ImportError('Cannot load connectors')
+                connectors = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(connectors)
+                _CONNECTORS_MODULE = connectors
+    return _CONNECTORS_MODULE
+
+
 class PortalHandler(BaseHTTPRequestHandler):
-    def _set_json_headers(self, status: int = 200) -> None:
+    # TCP_NODELAY on each connection: responses are complete once written, so never wait on Nagle
+    disable_nagle_algorithm = True
+
+    def _end_headers(self, body: bytes = b'') -> None:
+        """end_headers(), sending a small body in the same write as the header block"""
+        # HTTP/0.9 responses have no header buffer (send_header/end_headers skip it), so write plainly
+        if self.request_version != 'HTTP/0.9' and body and len(body) <= RESPONSE_COALESCE_LIMIT:
+            self._headers_buffer.append(b"\r\n" + body)
+            self.flush_headers()
+            return
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _set_json_headers(self, status: int = 200, content_length: int | None = None, etag: str | None = None,
+                          body: bytes = b'') -> None:
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
+        if content_length is not None:
+            self.send_header("Content-Length", str(content_length))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
         # Security headers
         self.send_header("X-Content-Type-Options", "nosniff")
         self.send_header("X-Frame-Options", "DENY")
         self.send_header("X-XSS-Protection", "1; mode=block")
         self.send_header("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
         self.send_header("Content-Security-Policy", "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'")
+        self._end_headers(body)
+
+    def _send_json(self, payload: Any, status: int = 200, etag: str | None = None) -> None:
+        """Serialize payload up front so the response carries a Content-Length (bytes are sent as-is)."""
+        body = payload if isinstance(payload, bytes) else json_bytes(payload)
+        self._set_json_headers(status, len(body), etag, body)
+
+    def _request_session(self) -> tuple[str | None, dict[str, str] | None]:
+        """Bearer token from the Authorization header and the session it maps to (if still valid)"""
+        auth_header = self.headers.get('Authorization', '')
+        token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
+        return token, (validate_session(token) if token else None)
+
+    def _reject_unread_body(self, payload: bytes, status: int, content_length: int) -> None:
+        """Error reply for a POST whose body was not read; large bodies are left unread and the connection closed"""
+        if content_length <= UNREAD_BODY_DRAIN_LIMIT:
+            # Closing with unread data pending can reset the socket before the client sees the error
+            self.rfile.read(content_length)
+        else:
+            self.close_connection = True
+        self._send_json(payload, status)
+
+    def _etag_matches(self, etag: str) -> bool:
+        """True when the client's If-None-Match already names this representation"""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        candidates = {c.strip().removeprefix('W/') for c in header.split(',')}
+        return etag in candidates or '*' in candidates
+
+    def _send_not_modified(self, etag: str) -> None:
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
         self.end_headers()
 
-    def _set_file_headers(self, path: str) -> None:
+    def _has_role(self, allowed_roles: frozenset[str]) -> bool:
+        """require_role() against the user already resolved for this request (no extra USERS lookup)"""
+        return self._session_user.get('role') in allowed_roles
+
+    def _db(self):
+        """DatabaseManager shared by every branch of the current request (opened on first use)"""
+        db = getattr(self, '_db_manager', None)
+        if db is None:
+            db = self._db_manager = DatabaseManager()
+        return db
+
+    @contextmanager
+    def _db_transaction(self):
+        """Commit/rollback like `with DatabaseManager()`, but keep the session open for the request"""
+        db = self._db()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        finally:
+            db = self.__dict__.pop('_db_manager', None)
+            if db is not None:
+                db.close()
+
+    def _set_file_headers(self, path: str, size: int | None = None, etag: str | None = None, body: bytes = b'') -> None:
         self.send_response(200)
-        if path.endswith('.html'):
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-        elif path.endswith('.js'):
-            self.send_header('Content-Type', 'application/javascript; charset=utf-8')
-        elif path.endswith('.css'):
-            self.send_header('Content-Type', 'text/css; charset=utf-8')
-        else:
-            self.send_header('Content-Type', 'application/octet-stream')
+        ext = os.path.splitext(path)[1]
+        self.send_header('Content-Type', STATIC_CONTENT_TYPES.get(ext, 'application/octet-stream'))
+        if etag is not None:
+            # Assets are not content-hashed, so always revalidate (cheap 304 when unchanged)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
         # Security headers
         self.send_header("X-Content-Type-Options", "nosniff")
         self.send_header("X-Frame-Options", "SAMEORIGIN")
         self.send_header("X-XSS-Protection", "1; mode=block")
-        self.end_headers()
+        if size is not None:
+            self.send_header('Content-Length', str(size))
+        self._end_headers(body)
 
     def do_GET(self):
         # Periodic cleanup of stale data
@@ -733,11 +1182,8 @@ class PortalHandler(BaseHTTPRequestHandler):
         if is_blocked:
             self.send_response(403)
             self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': 'Access denied',
-                'message': 'Your IP has been blocked due to suspicious activity'
-            }).encode('utf-8'))
+            self.send_header('Content-Length', str(len(ERR_IP_BLOCKED)))
+            self._end_headers(ERR_IP_BLOCKED)
             return
         
         # Rate limiting
@@ -746,8 +1192,8 @@ class PortalHandler(BaseHTTPRequestHandler):
             self.send_response(429)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Retry-After', '60')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Too many requests. Please try again later.'}).encode('utf-8'))
+            self.send_header('Content-Length', str(len(ERR_RATE_LIMITED)))
+            self._end_headers(ERR_RATE_LIMITED)
             return
         
         parsed = urlparse.urlparse(self.path)
@@ -759,48 +1205,45 @@ class PortalHandler(BaseHTTPRequestHandler):
             for value in values:
                 is_valid, error = validate_input_security(value, client_ip, f"query_param_{key}")
                 if not is_valid:
-                    self.send_response(400)
-                    self.send_header('Content-Type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': error}).encode('utf-8'))
+                    self._send_json({'error': error}, 400)
                     return
 
         # Session validation
-        auth_header = self.headers.get('Authorization', '')
-        token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-        session = validate_session(token) if token else None
+        token, session = self._request_session()
         is_authenticated = session is not None
+        # Resolve the session user and role once; endpoints below reuse them
+        self._session_user = get_session_user(session) or {}
+        self._role = (self._session_user.get('role') or '').lower()
         
         # Security monitoring endpoint (Admin only)
         if path == '/api/security/threats':
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
             
             # Get query parameters
             limit = int(qs.get('limit', [100])[0])
             
-            self._set_json_headers()
-            self.wfile.write(json.dumps({
-                'malicious_attempts': MALICIOUS_ATTEMPTS[-limit:],
-                'blocked_ips': dict(list(BLOCKED_IPS.items())[-50:]),  # Last 50 blocked IPs
-                'failed_logins': {k: v for k, v in list(FAILED_LOGINS.items())[-20:]},  # Last 20
-                'statistics': {
-                    'total_malicious_attempts': len(MALICIOUS_ATTEMPTS),
-                    'total_blocked_ips': len(BLOCKED_IPS),
-                    'permanent_blocks': sum(1 for b in BLOCKED_IPS.values() if b.get('permanent')),
-                    'active_lockouts': sum(1 for f in FAILED_LOGINS.values() 
-                                          if f.get('lockout_until', 0) > datetime.now().timestamp())
-                }
-            }, default=str).encode('utf-8'))
+            with SECURITY_LOCK:
+                threats = json_bytes({
+                    'malicious_attempts': list(MALICIOUS_ATTEMPTS)[-limit:],
+                    'blocked_ips': dict(list(BLOCKED_IPS.items())[-50:]),  # Last 50 blocked IPs
+                    'failed_logins': {k: v for k, v in list(FAILED_LOGINS.items())[-20:]},  # Last 20
+                    'statistics': {
+                        'total_malicious_attempts': len(MALICIOUS_ATTEMPTS),
+                        'total_blocked_ips': len(BLOCKED_IPS),
+                        'permanent_blocks': sum(1 for b in BLOCKED_IPS.values() if b.get('permanent')),
+                        'active_lockouts': sum(1 for f in FAILED_LOGINS.values() 
+                                              if f.get('lockout_until', 0) > datetime.now().timestamp())
+                    }
+                }, default=str)
+            self._send_json(threats)
             return
 
         # Audit log endpoint (Admin only)
         if path == '/api/audit':
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
             # Pagination and basic filtering
             page = int(qs.get('page', ['1'])[0])
@@ -837,27 +1280,23 @@ class PortalHandler(BaseHTTPRequestHandler):
                 'page_size': page_size,
                 'total': len(filtered)
             }
-            self._set_json_headers()
-            self.wfile.write(json.dumps(payload, default=str).encode('utf-8'))
+            self._send_json(json_bytes(payload, default=str))
             return
         
         # User Profile Endpoint
         if path == '/api/profile':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
             
             username = session.get('username')
             if not username:
-                self._set_json_headers(404)
-                self.wfile.write(json.dumps({'error': 'User not found'}).encode('utf-8'))
+                self._send_json(ERR_USER_NOT_FOUND, 404)
                 return
-            user = get_session_user(session)
+            user = self._session_user
             
             if not user:
-                self._set_json_headers(404)
-                self.wfile.write(json.dumps({'error': 'User not found'}).encode('utf-8'))
+                self._send_json(ERR_USER_NOT_FOUND, 404)
                 return
 
             # Best-effort enrich with customer record fields (email/phone/dob)
@@ -867,8 +1306,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                 with STATE_LOCK:
                     customer = CUSTOMERS.get(customer_id)
             
-            self._set_json_headers()
-            self.wfile.write(json.dumps({
+            self._send_json({
                 'username': username,
                 'name': user.get('name'),
                 'role': user.get('role'),
@@ -876,75 +1314,60 @@ class PortalHandler(BaseHTTPRequestHandler):
                 'email': (customer.get('email') if isinstance(customer, dict) else None) or username,
                 'phone': (customer.get('phone') if isinstance(customer, dict) else None),
                 'dob': (customer.get('dob') if isinstance(customer, dict) else None),
-            }).encode('utf-8'))
+            })
             return
         
         # BI Dashboard Endpoints (Admin/Management only)
         if path == '/api/bi/actuary':
-            if not require_role(session, ['admin', 'accountant', 'underwriter']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(BI_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
-            self._set_json_headers()
-            self.wfile.write(json.dumps(get_bi_data_actuary()).encode('utf-8'))
+            self._send_json(get_bi_data_actuary())
             return
         
         if path == '/api/bi/underwriting':
-            if not require_role(session, ['admin', 'underwriter']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(UNDERWRITING_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
-            self._set_json_headers()
-            self.wfile.write(json.dumps(get_bi_data_underwriting()).encode('utf-8'))
+            self._send_json(get_bi_data_underwriting())
             return
         
         if path == '/api/bi/accounting':
-            if not require_role(session, ['admin', 'accountant']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(FINANCE_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
-            self._set_json_headers()
-            self.wfile.write(json.dumps(get_bi_data_accounting()).encode('utf-8'))
+            self._send_json(get_bi_data_accounting())
             return
         
         # Financial Reporting Endpoints
         if path == '/api/financial/portfolio-report':
-            if not require_role(session, ['admin', 'accountant']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(FINANCE_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 report = svc.generate_portfolio_report()
-                self._set_json_headers()
-                self.wfile.write(json.dumps(report).encode('utf-8'))
+                self._send_json(report)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
         
         if path == '/api/financial/forecast':
-            if not require_role(session, ['admin', 'accountant']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(FINANCE_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
                 years = int(qs.get('years', [25])[0])
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 report = svc.generate_forecast_report(years=years)
-                self._set_json_headers()
-                self.wfile.write(json.dumps(report).encode('utf-8'))
+                self._send_json(report)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
         
         if path == '/api/financial/customer-projection':
-            if not require_role(session, ['admin', 'accountant', 'underwriter', 'customer']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(NON_CLAIMS_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
                 # Get parameters from query string with defaults
@@ -955,7 +1378,6 @@ class PortalHandler(BaseHTTPRequestHandler):
                 age = int(qs.get('age', [35])[0])
                 customer_id = qs.get('customer_id', [None])[0]
                 
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 report = svc.generate_customer_projection(
                     customer_id=customer_id,
@@ -965,50 +1387,39 @@ class PortalHandler(BaseHTTPRequestHandler):
                     term_years=term_years,
                     age=age
                 )
-                self._set_json_headers()
-                self.wfile.write(json.dumps(report).encode('utf-8'))
+                self._send_json(report)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
         
         if path == '/api/financial/data-integrity':
-            if not require_role(session, ['admin', 'accountant']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(FINANCE_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 report = svc.validate_data_integrity()
-                self._set_json_headers()
-                self.wfile.write(json.dumps(report).encode('utf-8'))
+                self._send_json(report)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
         
         if path == '/api/financial/dashboard-summary':
-            if not require_role(session, ['admin', 'accountant', 'underwriter', 'claims', 'customer']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(PORTAL_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
                 dashboard_type = qs.get('type', ['accountant'])[0]
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 report = svc.get_dashboard_summary(dashboard_type)
-                self._set_json_headers()
-                self.wfile.write(json.dumps(report).encode('utf-8'))
+                self._send_json(report)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
         
         if path == '/api/financial/premium-calculator':
-            if not require_role(session, ['admin', 'accountant', 'underwriter', 'customer']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(NON_CLAIMS_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             try:
                 coverage = float(qs.get('coverage', [250000])[0])
@@ -1017,144 +1428,121 @@ class PortalHandler(BaseHTTPRequestHandler):
                 savings_pct = float(qs.get('savings_pct', [0.50])[0])
                 term_years = int(qs.get('term_years', [25])[0])
                 
-                from services.financial_reporting_service import FinancialReportingService
                 svc = FinancialReportingService(POLICIES, CLAIMS, BILLING, CUSTOMERS, UNDERWRITING_APPLICATIONS)
                 premium = svc.calculate_premium(coverage, age, adl_level, savings_pct, term_years)
-                self._set_json_headers()
-                self.wfile.write(json.dumps(premium).encode('utf-8'))
+                self._send_json(premium)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 500)
             return
 
         # Platform Metrics Endpoint (for dashboards)
         if path == '/api/metrics':
             try:
-                from services.metrics_service import MetricsService
                 ms = MetricsService(POLICIES, CLAIMS, BILLING)
                 data = ms.summary()
             except Exception:
                 data = {
                     'policies': {'total': len(POLICIES), 'active': sum(1 for p in POLICIES.values() if p.get('status') == 'active')},
-                    'claims': {'pending': sum(1 for c in CLAIMS.values() if c.get('status') in ['pending', 'under_review']),
+                    'claims': {'pending': sum(1 for c in CLAIMS.values() if c.get('status') in CLAIM_PENDING_STATUSES),
                                'approved': sum(1 for c in CLAIMS.values() if c.get('status') == 'approved')},
                     'billing': {'overdue': sum(1 for b in BILLING.values() if b.get('status') == 'overdue'),
-                                'outstanding': sum(1 for b in BILLING.values() if b.get('status') in ['outstanding', 'partial'])}
+                                'outstanding': sum(1 for b in BILLING.values() if b.get('status') in BILL_OUTSTANDING_STATUSES)}
                 }
-            self._set_json_headers()
-            self.wfile.write(json.dumps({'metrics': data, 'ts': datetime.now().isoformat()}).encode('utf-8'))
+            self._send_json({'metrics': data, 'ts': datetime.now().isoformat()})
             return
 
         # Market data endpoints (crypto + indexes)
         if path == '/api/market/crypto':
-            if not require_role(session, ['admin', 'accountant', 'customer', 'underwriter', 'claims']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(PORTAL_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             symbols = qs.get('symbols', ['BTC,ETH'])[0]
-            symbols_list = [s.strip() for s in symbols.split(',') if s.strip()]
+            # Normalize and dedupe up front (order-preserving) so repeats don't fan out upstream
+            symbols_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
             if not _market_data:
-                self._set_json_headers(503)
-                self.wfile.write(json.dumps({'error': 'Market data service unavailable'}).encode('utf-8'))
+                self._send_json(ERR_MARKET_DATA_UNAVAILABLE, 503)
                 return
             try:
                 data = _market_data.get_crypto_prices_usd(symbols_list)
-                self._set_json_headers()
-                self.wfile.write(json.dumps(data).encode('utf-8'))
+                self._send_json(data)
             except Exception as e:
-                self._set_json_headers(502)
-                self.wfile.write(json.dumps({'error': 'Market data fetch failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Market data fetch failed', 'details': str(e)}, 502)
             return
 
         if path == '/api/market/index':
-            if not require_role(session, ['admin', 'accountant', 'customer', 'underwriter', 'claims']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+            if not self._has_role(PORTAL_ROLES):
+                self._send_json(ERR_UNAUTHORIZED, 403)
                 return
             symbols = qs.get('symbols', ['^spx'])[0]
-            symbols_list = [s.strip() for s in symbols.split(',') if s.strip()]
+            symbols_list = list(dict.fromkeys(s.strip().lower() for s in symbols.split(',') if s.strip()))
             if not _market_data:
-                self._set_json_headers(503)
-                self.wfile.write(json.dumps({'error': 'Market data service unavailable'}).encode('utf-8'))
+                self._send_json(ERR_MARKET_DATA_UNAVAILABLE, 503)
                 return
             try:
                 data = _market_data.get_index_quotes(symbols_list)
-                self._set_json_headers()
-                self.wfile.write(json.dumps(data).encode('utf-8'))
+                self._send_json(data)
             except Exception as e:
-                self._set_json_headers(502)
-                self.wfile.write(json.dumps({'error': 'Market data fetch failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Market data fetch failed', 'details': str(e)}, 502)
             return
 
         # Admin: list actuarial tables (metadata only)
         if path == '/api/admin/actuarial-tables':
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not self._has_role(ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
 
             # DB mode: list via repository; otherwise in-memory list.
             if USE_DATABASE and database_enabled:
                 try:
-                    from database.manager import DatabaseManager
-                    with DatabaseManager() as db:
+                    with self._db_transaction() as db:
                         tables = [t.to_dict() for t in db.actuarial.list(limit=200)]
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'items': tables}).encode('utf-8'))
+                    self._send_json({'items': tables})
                     return
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': 'Failed to load actuarial tables', 'details': str(e)}).encode('utf-8'))
+                    self._send_json({'error': 'Failed to load actuarial tables', 'details': str(e)}, 500)
                     return
 
             with STATE_LOCK:
                 items = list(ACTUARIAL_TABLES.values())
-            items = sorted(items, key=lambda x: x.get('created_date', ''), reverse=True)
-            self._set_json_headers()
-            self.wfile.write(json.dumps({'items': items}).encode('utf-8'))
+            items.sort(key=itemgetter('created_date'), reverse=True)
+            self._send_json({'items': items})
             return
 
         # Token registry (enabled-only for customers)
         if path == '/api/token-registry':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
 
-            user = get_session_user(session) or {}
-            role = (user.get('role') or '').lower()
+            user = self._session_user
+            role = self._role
             enabled_only = role == 'customer'
 
             if USE_DATABASE and database_enabled:
                 try:
-                    from database.manager import DatabaseManager
-                    with DatabaseManager() as db:
+                    with self._db_transaction() as db:
                         rows = [r.to_dict() for r in db.tokens.list(enabled_only=enabled_only, limit=500)]
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'items': rows}).encode('utf-8'))
+                    self._send_json({'items': rows})
                     return
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': 'Failed to load token registry', 'details': str(e)}).encode('utf-8'))
+                    self._send_json({'error': 'Failed to load token registry', 'details': str(e)}, 500)
                     return
 
             with STATE_LOCK:
                 rows = list(TOKEN_REGISTRY.values())
             if enabled_only:
                 rows = [r for r in rows if r.get('enabled', True)]
-            self._set_json_headers()
-            self.wfile.write(json.dumps({'items': rows}).encode('utf-8'))
+            self._send_json({'items': rows})
             return
         
         # Policy Management Endpoints
         if path == '/api/policies':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
 
-            user = get_session_user(session) or {}
-            role = (user.get('role') or '').lower()
+            user = self._session_user
+            role = self._role
             session_customer_id = user.get('customer_id') or session.get('customer_id')
 
             policy_id = qs.get('id', [None])[0]
@@ -1162,21 +1550,18 @@ class PortalHandler(BaseHTTPRequestHandler):
                 policy = POLICIES.get(policy_id)
                 # Customers can only view their own policies
                 if policy and (role != 'customer' or (session_customer_id and policy.get('customer_id') == session_customer_id)):
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(policy).encode('utf-8'))
+                    self._send_json(policy)
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Policy not found'}).encode('utf-8'))
+                    self._send_json(ERR_POLICY_NOT_FOUND, 404)
             else:
-                all_items = list(POLICIES.values())
-                if role == 'customer' and session_customer_id:
-                    all_items = [p for p in all_items if p.get('customer_id') == session_customer_id]
-
+                customer_scoped = role == 'customer' and session_customer_id
                 wants_paging = ('page' in qs) or ('page_size' in qs)
                 if not wants_paging:
+                    all_items = list(POLICIES.values())
+                    if customer_scoped:
+                        all_items = [p for p in all_items if p.get('customer_id') == session_customer_id]
                     # Backward-compatible: older UIs expect a plain list
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(all_items).encode('utf-8'))
+                    self._send_json(all_items)
                 else:
                     page = int(qs.get('page', ['1'])[0])
                     page_size = int(qs.get('page_size', ['50'])[0])
@@ -1184,28 +1569,33 @@ class PortalHandler(BaseHTTPRequestHandler):
                     page_size = max(1, min(500, page_size))
                     start = (page - 1) * page_size
                     end = start + page_size
-                    page_items = all_items[start:end]
+                    if customer_scoped:
+                        all_items = [p for p in POLICIES.values() if p.get('customer_id') == session_customer_id]
+                        total = len(all_items)
+                        page_items = all_items[start:end]
+                    else:
+                        # Unfiltered: pull only the requested window instead of copying every policy
+                        total = len(POLICIES)
+                        page_items = list(itertools.islice(POLICIES.values(), start, end))
                     payload = {
                         'items': page_items,
                         # Convenience alias (some UIs expect this)
                         'policies': page_items,
                         'page': page,
                         'page_size': page_size,
-                        'total': len(all_items)
+                        'total': total
                     }
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(payload).encode('utf-8'))
+                    self._send_json(payload)
             return
         
         # Claims Management Endpoints
         if path == '/api/claims':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
 
-            user = get_session_user(session) or {}
-            role = (user.get('role') or '').lower()
+            user = self._session_user
+            role = self._role
             session_customer_id = user.get('customer_id') or session.get('customer_id')
 
             claim_id = qs.get('id', [None])[0]
@@ -1217,27 +1607,33 @@ class PortalHandler(BaseHTTPRequestHandler):
                     claim.get('customer_id') == session_customer_id or
                     (claim.get('policy_id') and POLICIES.get(claim.get('policy_id'), {}).get('customer_id') == session_customer_id)
                 ))):
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(claim).encode('utf-8'))
+                    self._send_json(claim)
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Claim not found'}).encode('utf-8'))
+                    self._send_json(ERR_CLAIM_NOT_FOUND, 404)
             else:
-                claims_list = list(CLAIMS.values())
-                if status:
-                    claims_list = [c for c in claims_list if c.get('status') == status]
-                if role == 'customer' and session_customer_id:
-                    def _belongs(c: Dict[str, Any]) -> bool:
-                        if c.get('customer_id') == session_customer_id:
-                            return True
-                        pid = c.get('policy_id')
-                        return bool(pid and POLICIES.get(pid, {}).get('customer_id') == session_customer_id)
-                    claims_list = [c for c in claims_list if _belongs(c)]
-
                 wants_paging = ('page' in qs) or ('page_size' in qs)
+                customer_scoped = role == 'customer' and session_customer_id
+                claims_list = None
+                if status or customer_scoped or not wants_paging:
+                    owned_policy_ids = set()
+                    if customer_scoped:
+                        # Resolve the customer's policies once instead of a POLICIES lookup per claim
+                        owned_policy_ids = {
+                            pid for pid, p in POLICIES.items()
+                            if p.get('customer_id') == session_customer_id
+                        }
+                    # Status and ownership filters applied in a single pass
+                    claims_list = [
+                        c for c in CLAIMS.values()
+                        if (not status or c.get('status') == status) and (
+                            not customer_scoped
+                            or c.get('customer_id') == session_customer_id
+                            or c.get('policy_id') in owned_policy_ids
+                        )
+                    ]
+
                 if not wants_paging:
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(claims_list).encode('utf-8'))
+                    self._send_json(claims_list)
                 else:
                     page = int(qs.get('page', ['1'])[0])
                     page_size = int(qs.get('page_size', ['50'])[0])
@@ -1245,17 +1641,22 @@ class PortalHandler(BaseHTTPRequestHandler):
                     page_size = max(1, min(500, page_size))
                     start = (page - 1) * page_size
                     end = start + page_size
-                    page_items = claims_list[start:end]
+                    if claims_list is None:
+                        # Unfiltered: pull only the requested window instead of copying every claim
+                        total = len(CLAIMS)
+                        page_items = list(itertools.islice(CLAIMS.values(), start, end))
+                    else:
+                        total = len(claims_list)
+                        page_items = claims_list[start:end]
                     payload = {
                         'items': page_items,
                         # Convenience alias (some UIs expect this)
                         'claims': page_items,
                         'page': page,
                         'page_size': page_size,
-                        'total': len(claims_list)
+                        'total': total
                     }
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(payload).encode('utf-8'))
+                    self._send_json(payload)
             return
         
         # Underwriting Applications Endpoints
@@ -1264,14 +1665,11 @@ class PortalHandler(BaseHTTPRequestHandler):
             if app_id:
                 app = UNDERWRITING_APPLICATIONS.get(app_id)
                 if app:
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(app).encode('utf-8'))
+                    self._send_json(app)
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Application not found'}).encode('utf-8'))
+                    self._send_json(ERR_APPLICATION_NOT_FOUND, 404)
             else:
-                self._set_json_headers()
-                self.wfile.write(json.dumps(list(UNDERWRITING_APPLICATIONS.values())).encode('utf-8'))
+                self._send_json(list(UNDERWRITING_APPLICATIONS.values()))
             return
         
         # Customers Endpoint
@@ -1280,25 +1678,21 @@ class PortalHandler(BaseHTTPRequestHandler):
             if customer_id:
                 customer = CUSTOMERS.get(customer_id)
                 if customer:
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(customer).encode('utf-8'))
+                    self._send_json(customer)
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Customer not found'}).encode('utf-8'))
+                    self._send_json(ERR_CUSTOMER_NOT_FOUND, 404)
             else:
-                self._set_json_headers()
-                self.wfile.write(json.dumps(list(CUSTOMERS.values())).encode('utf-8'))
+                self._send_json(list(CUSTOMERS.values()))
             return
 
         # Customer status endpoint (post-application visibility)
         if path == '/api/customer/status':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
 
-            user = get_session_user(session) or {}
-            role = (user.get('role') or '').lower()
+            user = self._session_user
+            role = self._role
             session_customer_id = user.get('customer_id') or session.get('customer_id')
 
             requested_customer_id = qs.get('customer_id', [None])[0]
@@ -1307,20 +1701,17 @@ class PortalHandler(BaseHTTPRequestHandler):
                 customer_id = session_customer_id
 
             if not customer_id:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'customer_id is required'}).encode('utf-8'))
+                self._send_json({'error': 'customer_id is required'}, 400)
                 return
 
             # Non-customer roles can request arbitrary customer_id; customers cannot.
             if role == 'customer' and requested_customer_id and requested_customer_id != customer_id:
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Forbidden'}).encode('utf-8'))
+                self._send_json(ERR_FORBIDDEN, 403)
                 return
 
             customer = CUSTOMERS.get(customer_id)
             if not customer:
-                self._set_json_headers(404)
-                self.wfile.write(json.dumps({'error': 'Customer not found'}).encode('utf-8'))
+                self._send_json(ERR_CUSTOMER_NOT_FOUND, 404)
                 return
 
             policies = [p for p in POLICIES.values() if p.get('customer_id') == customer_id]
@@ -1334,7 +1725,7 @@ class PortalHandler(BaseHTTPRequestHandler):
             # Determine overall application status (simple heuristic)
             overall = 'no_application'
             if uw_apps:
-                most_recent = sorted(uw_apps, key=lambda x: x.get('submitted_date', ''), reverse=True)[0]
+                most_recent = max(uw_apps, key=lambda x: x.get('submitted_date', ''))
                 overall = most_recent.get('status', 'pending')
                 if overall == 'approved':
                     # Check if policy is active
@@ -1363,32 +1754,29 @@ class PortalHandler(BaseHTTPRequestHandler):
                 }
             }
 
-            self._set_json_headers()
-            self.wfile.write(json.dumps(payload).encode('utf-8'))
+            self._send_json(payload)
             return
 
         # Customer billing "next due" (portal convenience)
         if path == '/api/billing/next-due':
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized'}).encode('utf-8'))
+                self._send_json(ERR_UNAUTHORIZED, 401)
                 return
 
-            user = get_session_user(session) or {}
-            role = (user.get('role') or '').lower()
+            user = self._session_user
+            role = self._role
             session_customer_id = user.get('customer_id') or session.get('customer_id')
             if role == 'customer' and not session_customer_id:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'customer_id unavailable'}).encode('utf-8'))
+                self._send_json(ERR_CUSTOMER_ID_UNAVAILABLE, 400)
                 return
 
             # Determine which policies belong to this customer
             if role == 'customer':
                 policy_ids = {p.get('id') for p in POLICIES.values() if p.get('customer_id') == session_customer_id}
                 bills = [b for b in BILLING.values()
-                         if b.get('policy_id') in policy_ids and b.get('status') not in ('paid',)]
+                         if b.get('policy_id') in policy_ids and b.get('status') != 'paid']
             else:
-                bills = [b for b in BILLING.values() if b.get('status') not in ('paid',)]
+                bills = [b for b in BILLING.values() if b.get('status') != 'paid']
 
             def _due_ts(b: Dict[str, Any]) -> float:
                 try:
@@ -1396,23 +1784,20 @@ class PortalHandler(BaseHTTPRequestHandler):
                 except Exception:
                     return float('inf')
 
-            next_bill = sorted(bills, key=_due_ts)[0] if bills else None
-            self._set_json_headers()
-            self.wfile.write(json.dumps({'next_due': next_bill}).encode('utf-8'))
+            next_bill = min(bills, key=_due_ts, default=None)
+            self._send_json({'next_due': next_bill})
             return
         
         if path.startswith('/api/statement'):
             customer_id = qs.get('customer_id', ['CUST001'])[0]
             data = try_get_statement_from_engine(customer_id) or get_mock_statement(customer_id)
-            self._set_json_headers()
-            self.wfile.write(json.dumps(data).encode('utf-8'))
+            self._send_json(data)
             return
 
         if path.startswith('/api/allocations'):
             customer_id = qs.get('customer_id', ['CUST001'])[0]
             data = {"allocations": (try_get_statement_from_engine(customer_id) or get_mock_statement(customer_id))["allocations"]}
-            self._set_json_headers()
-            self.wfile.write(json.dumps(data).encode('utf-8'))
+            self._send_json(data)
             return
 
         # Validation endpoints (connectors)
@@ -1424,15 +1809,7 @@ class PortalHandler(BaseHTTPRequestHandler):
             # Best-effort connector usage
             result = {'status': 'unavailable', 'details': {}}
             try:
-                # Try to load connectors by file location to support running server.py directly
-                import importlib.util
-                conn_path = os.path.join(os.path.dirname(__file__), 'connectors.py')
-                spec = importlib.util.spec_from_file_location('web_portal.connectors', conn_path)
-                if spec and spec.loader:
-                    connectors = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(connectors)
-                else:
-                    raise ImportError('Cannot load connectors')
+                connectors = load_connectors()
 
                 if t == 'ni':
                     res = connectors.NationalInsuranceConnector().validate(national_id=value, dob=extra)
@@ -1448,8 +1825,7 @@ class PortalHandler(BaseHTTPRequestHandler):
             except Exception as e:
                 result = {'status': 'error', 'details': {'error': str(e)}}
 
-            self._set_json_headers()
-            self.wfile.write(json.dumps(result).encode('utf-8'))
+            self._send_json(result)
             return
 
         # Disclaimers endpoint
@@ -1458,41 +1834,19 @@ class PortalHandler(BaseHTTPRequestHandler):
             action = qs.get('action', [None])[0]
             disc_type = qs.get('type', [None])[0]
             
-            result: Dict[str, Any] = {'disclaimers': []}
             try:
-                # Try to import accounting_engine to get disclaimers
-                sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-                from accounting_engine import AccountingEngine, DisclaimerType
-                engine = AccountingEngine()
-                
-                if action:
-                    disclaimers = engine.get_all_disclaimers_for_action(action)
-                elif disc_type:
-                    # Try to match the type
-                    try:
-                        dt = DisclaimerType[disc_type.upper()]
-                        disc = engine.get_disclaimer(dt)
-                        disclaimers = [disc] if disc else []
-                    except (KeyError, AttributeError):
-                        disclaimers = []
-                else:
-                    disclaimers = engine.get_all_disclaimers()
-                
-                result['disclaimers'] = [
-                    {
-                        'type': d.disclaimer_type.name if hasattr(d.disclaimer_type, 'name') else str(d.disclaimer_type),
-                        'title': d.title,
-                        'content': d.content,
-                        'version': d.version,
-                        'effective_date': str(d.effective_date)
-                    }
-                    for d in disclaimers if d
-                ]
+                # Type is only consulted without an action; normalize so equivalent queries share a cache entry
+                result: Any = get_disclaimers_json(action, None if action else (disc_type.upper() if disc_type else None))
             except Exception as e:
-                result['error'] = str(e)
-            
-            self._set_json_headers()
-            self.wfile.write(json.dumps(result).encode('utf-8'))
+                result = {'disclaimers': [], 'error': str(e)}
+                self._send_json(result)
+                return
+
+            etag = '"%s"' % hashlib.blake2b(result, digest_size=8).hexdigest()
+            if self._etag_matches(etag):
+                self._send_not_modified(etag)
+                return
+            self._send_json(result, etag=etag)
             return
 
         # Investment portfolio endpoint
@@ -1500,16 +1854,13 @@ class PortalHandler(BaseHTTPRequestHandler):
             customer_id = qs.get('customer_id', ['CUST001'])[0]
             result = {'customer_id': customer_id, 'message': 'Portfolio data unavailable'}
             try:
-                sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-                from accounting_engine import AccountingEngine
-                engine = AccountingEngine()
+                engine = get_accounting_engine()
                 portfolio = engine.get_investment_portfolio_summary(customer_id)  # type: ignore
                 result = portfolio  # type: ignore
             except Exception as e:
                 result['error'] = str(e)
             
-            self._set_json_headers()
-            self.wfile.write(json.dumps(result, default=str).encode('utf-8'))
+            self._send_json(json_bytes(result, default=str))
             return
 
         # Projected returns endpoint
@@ -1518,16 +1869,13 @@ class PortalHandler(BaseHTTPRequestHandler):
             years = int(qs.get('years', ['5'])[0])
             result = {'customer_id': customer_id, 'message': 'Projections unavailable'}
             try:
-                sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-                from accounting_engine import AccountingEngine
-                engine = AccountingEngine()
+                engine = get_accounting_engine()
                 returns = engine.get_projected_returns_analysis(customer_id, years)  # type: ignore
                 result = returns  # type: ignore
             except Exception as e:
                 result['error'] = str(e)
             
-            self._set_json_headers()
-            self.wfile.write(json.dumps(result, default=str).encode('utf-8'))
+            self._send_json(json_bytes(result, default=str))
             return
 
         # Serve static files from web_portal/static
@@ -1539,9 +1887,35 @@ class PortalHandler(BaseHTTPRequestHandler):
 
         if os.path.isfile(file_path):
             try:
-                self._set_file_headers(file_path)
+                # Serve hot assets from memory while their mtime and size are unchanged
+                st = os.stat(file_path)
+                etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+                if self._etag_matches(etag):
+                    self._send_not_modified(etag)
+                    return
+                cached = _STATIC_CACHE.get(file_path)
+                if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    self._set_file_headers(file_path, cached[1], etag, cached[2])
+                    return
                 with open(file_path, 'rb') as fh:
-                    self.wfile.write(fh.read())
+                    st = os.fstat(fh.fileno())
+                    etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+                    if st.st_size <= STATIC_CACHE_MAX_FILE_SIZE:
+                        data = fh.read()
+                        with _STATIC_CACHE_LOCK:
+                            if file_path not in _STATIC_CACHE and len(_STATIC_CACHE) >= STATIC_CACHE_MAX_ENTRIES:
+                                _STATIC_CACHE.pop(next(iter(_STATIC_CACHE)))
+                            _STATIC_CACHE[file_path] = (st.st_mtime_ns, len(data), data)
+                        self._set_file_headers(file_path, len(data), etag, data)
+                    else:
+                        # Stream in fixed-size chunks so large assets never sit in memory whole
+                        self._set_file_headers(file_path, st.st_size, etag)
+                        self.wfile.flush()
+                        if hasattr(self.connection, 'sendfile'):
+                            # Zero-copy via os.sendfile where supported; socket.sendfile falls back to send() itself
+                            self.connection.sendfile(fh, 0, st.st_size)
+                        else:
+                            shutil.copyfileobj(fh, self.wfile, STATIC_CHUNK_SIZE)
             except Exception as e:
                 self.send_error(500, str(e))
         else:
@@ -1559,11 +1933,8 @@ class PortalHandler(BaseHTTPRequestHandler):
         if is_blocked:
             self.send_response(403)
             self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': 'Access denied',
-                'message': 'Your IP has been blocked due to suspicious activity'
-            }).encode('utf-8'))
+            self.send_header('Content-Length', str(len(ERR_IP_BLOCKED)))
+            self._end_headers(ERR_IP_BLOCKED)
             return
         
         # Rate limiting
@@ -1572,11 +1943,10 @@ class PortalHandler(BaseHTTPRequestHandler):
             self.send_response(429)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Retry-After', '60')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Too many requests. Please try again later.'}).encode('utf-8'))
+            self.send_header('Content-Length', str(len(ERR_RATE_LIMITED)))
+            self._end_headers(ERR_RATE_LIMITED)
             return
         
-        # Check request size
         # Check request size
         content_length = int(self.headers.get('Content-Length', 0))
         if content_length > MAX_REQUEST_SIZE:
@@ -1586,8 +1956,8 @@ class PortalHandler(BaseHTTPRequestHandler):
             })
             self.send_response(413)
             self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Request too large'}).encode('utf-8'))
+            self.send_header('Content-Length', str(len(ERR_REQUEST_TOO_LARGE)))
+            self._end_headers(ERR_REQUEST_TOO_LARGE)
             return
         
         parsed = urlparse.urlparse(self.path)
@@ -1598,9 +1968,18 @@ class PortalHandler(BaseHTTPRequestHandler):
             self.handle_quote_submission()
             return
         
-        # Regular JSON POST requests
-        length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(length).decode('utf-8') if length else ''
+        # Resolve the caller once; every branch below shares token/session
+        token, session = self._request_session()
+        if path in POST_ADMIN_REQUIRED or path in POST_LOGIN_REQUIRED:
+            if path in POST_ADMIN_REQUIRED and not require_role(session, ADMIN_ROLES):
+                self._reject_unread_body(ERR_ADMIN_REQUIRED, 403, content_length)
+                return
+            if not session:
+                self._reject_unread_body(ERR_LOGIN_REQUIRED, 401, content_length)
+                return
+
+        # Regular JSON POST requests; the parsers take bytes, so only CSV uploads decode
+        body = self.rfile.read(content_length) if content_length else b''
         
         # Demo login endpoint with secure password verification
         if path == '/api/login':
@@ -1610,112 +1989,103 @@ class PortalHandler(BaseHTTPRequestHandler):
             if not check_login_lockout(client_ip):
                 lockout_data = FAILED_LOGINS.get(client_ip, {})
                 remaining = int(lockout_data.get('lockout_until', 0) - datetime.now().timestamp())
-                self._set_json_headers(429)
-                self.wfile.write(json.dumps({
+                self._send_json({
                     'error': f'Too many failed login attempts. Try again in {remaining} seconds.',
                     'lockout_remaining': remaining
-                }).encode('utf-8'))
+                }, 429)
                 return
             
             try:
-                creds = json.loads(body)
+                creds = json_loads(body)
                 username = creds.get('username', '').strip()
                 password = creds.get('password', '')
                 
                 # Input validation
                 if not username or not password:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Username and password required'}).encode('utf-8'))
+                    self._send_json(ERR_CREDENTIALS_REQUIRED, 400)
                     return
                 
                 # Security validation on username
                 is_valid, error = validate_input_security(username, client_ip, 'username')
                 if not is_valid:
                     record_failed_login(client_ip)
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid username format'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_USERNAME, 400)
                     return
                 
                 if len(password) < 6:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid credentials'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_CREDENTIALS, 400)
                     return
                 
                 user = USERS.get(username)
-                if user and verify_password(password, user['hash'], user['salt']):
+                stored = user or _DUMMY_PASSWORD
+                password_ok = verify_password(password, stored['hash'], stored['salt'])
+                if bool(user) & password_ok:
                     # Clear failed login attempts on success
-                    with STATE_LOCK:
-                        if client_ip in FAILED_LOGINS:
-                            del FAILED_LOGINS[client_ip]
+                    with SECURITY_LOCK:
+                        FAILED_LOGINS.pop(client_ip, None)
                     
                     # Generate secure session token
                     token = f"phins_{secrets.token_urlsafe(32)}"
-                    expires = datetime.now() + timedelta(seconds=SESSION_TIMEOUT)
+                    now = datetime.now()
+                    expires_iso = (now + timedelta(seconds=SESSION_TIMEOUT)).isoformat()
+                    customer_id = user.get('customer_id')
                     
                     # Store session
                     with STATE_LOCK:
                         SESSIONS[token] = {
                             'username': username,
-                            'expires': expires.isoformat(),
-                            'customer_id': user.get('customer_id'),
+                            'expires': expires_iso,
+                            'customer_id': customer_id,
                             'ip': client_ip,
-                            'created_at': datetime.now().isoformat()
+                            'created_at': now.isoformat()
                         }
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'token': token,
                         'role': user['role'],
                         'name': user['name'],
-                        'customer_id': user.get('customer_id'),
-                        'expires': expires.isoformat()
-                    }).encode('utf-8'))
+                        'customer_id': customer_id,
+                        'expires': expires_iso
+                    })
                 else:
                     # Record failed login attempt
                     record_failed_login(client_ip)
                     
-                    self._set_json_headers(401)
-                    self.wfile.write(json.dumps({'error': 'Invalid credentials'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_CREDENTIALS, 401)
             except json.JSONDecodeError:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8'))
+                self._send_json(ERR_INVALID_JSON, 400)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': 'Internal server error'}).encode('utf-8'))
+                self._send_json(ERR_INTERNAL, 500)
             return
         
         # User Registration Endpoint
         if path == '/api/register':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 name = sanitize_input(data.get('name', ''), 100)
-                email = sanitize_input(data.get('email', ''), 254).lower()
+                email = sanitize_input(data.get('email', ''), 254, lower=True)
                 phone = sanitize_input(data.get('phone', ''), 20)
                 dob = data.get('dob', '')
                 password = data.get('password', '')
                 
                 # Validation
                 if not name or not email or not password:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Name, email, and password are required'}).encode('utf-8'))
+                    self._send_json({'error': 'Name, email, and password are required'}, 400)
                     return
                 
                 if not validate_email(email):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid email format'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_EMAIL, 400)
                     return
                 
                 if len(password) < 8:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Password must be at least 8 characters'}).encode('utf-8'))
+                    self._send_json(ERR_PASSWORD_TOO_SHORT, 400)
                     return
                 
                 # Check if user already exists
                 with STATE_LOCK:
                     user_exists = email in USERS
                 if user_exists:
-                    self._set_json_headers(409)
-                    self.wfile.write(json.dumps({'error': 'Email already registered'}).encode('utf-8'))
+                    self._send_json({'error': 'Email already registered'}, 409)
                     return
                 
                 # Create customer record
@@ -1741,38 +2111,33 @@ class PortalHandler(BaseHTTPRequestHandler):
                         'customer_id': customer_id
                     }
                 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({
+                self._send_json({
                     'success': True,
                     'customer_id': customer_id,
                     'email': email,
                     'message': 'Account created successfully. Please login with your credentials.'
-                }).encode('utf-8'))
+                }, 201)
             except json.JSONDecodeError:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8'))
+                self._send_json(ERR_INVALID_JSON, 400)
             except Exception:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': 'Registration failed'}).encode('utf-8'))
+                self._send_json({'error': 'Registration failed'}, 500)
             return
         
         # Password Reset Endpoint
         if path == '/api/reset-password':
             try:
-                data = json.loads(body)
-                username = sanitize_input(data.get('username', ''), 254).lower()
-                email = sanitize_input(data.get('email', ''), 254).lower()
+                data = json_loads(body)
+                username = sanitize_input(data.get('username', ''), 254, lower=True)
+                email = sanitize_input(data.get('email', ''), 254, lower=True)
                 new_password = data.get('new_password', '')
                 
                 # Validation
                 if not username or not email or not new_password:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'All fields are required'}).encode('utf-8'))
+                    self._send_json({'error': 'All fields are required'}, 400)
                     return
                 
                 if len(new_password) < 8:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Password must be at least 8 characters'}).encode('utf-8'))
+                    self._send_json(ERR_PASSWORD_TOO_SHORT, 400)
                     return
                 
                 # Verify user exists and email matches
@@ -1783,8 +2148,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                     username = email
                 
                 if not user:
-                    self._set_json_headers(401)
-                    self.wfile.write(json.dumps({'error': 'Invalid credentials'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_CREDENTIALS, 401)
                     return
                 
                 # Verify email matches customer record
@@ -1792,135 +2156,114 @@ class PortalHandler(BaseHTTPRequestHandler):
                 if customer_id:
                     customer = CUSTOMERS.get(customer_id)
                     if customer and customer.get('email', '').lower() != email:
-                        self._set_json_headers(401)
-                        self.wfile.write(json.dumps({'error': 'Email does not match our records'}).encode('utf-8'))
+                        self._send_json({'error': 'Email does not match our records'}, 401)
                         return
                 
                 # Update password
                 pwd_hash = hash_password(new_password)
-                USERS[username]['hash'] = pwd_hash['hash']
-                USERS[username]['salt'] = pwd_hash['salt']
+                user['hash'] = pwd_hash['hash']
+                user['salt'] = pwd_hash['salt']
                 
                 # Invalidate all existing sessions for this user
-                sessions_to_remove = [token for token, sess in SESSIONS.items() if sess.get('username') == username]
-                for token in sessions_to_remove:
-                    del SESSIONS[token]
+                with STATE_LOCK:
+                    tokens = user_session_tokens(username)
+                    for token in tokens:
+                        del SESSIONS[token]
+                    forget_sessions(tokens)
                 
-                self._set_json_headers()
-                self.wfile.write(json.dumps({
+                self._send_json({
                     'success': True,
                     'message': 'Password reset successfully. Please login with your new password.'
-                }).encode('utf-8'))
+                })
             except json.JSONDecodeError:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8'))
+                self._send_json(ERR_INVALID_JSON, 400)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': 'Password reset failed'}).encode('utf-8'))
+                self._send_json({'error': 'Password reset failed'}, 500)
             return
         
         # Change Password Endpoint (authenticated users)
         if path == '/api/change-password':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Please login.'}).encode('utf-8'))
+                self._send_json(ERR_LOGIN_REQUIRED, 401)
                 return
             
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 current_password = data.get('current_password', '')
                 new_password = data.get('new_password', '')
                 
                 if not current_password or not new_password:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Current and new password are required'}).encode('utf-8'))
+                    self._send_json({'error': 'Current and new password are required'}, 400)
                     return
                 
                 if len(new_password) < 8:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'New password must be at least 8 characters'}).encode('utf-8'))
+                    self._send_json({'error': 'New password must be at least 8 characters'}, 400)
                     return
                 
                 username = session.get('username')
                 user = USERS.get(username)
                 
                 if not user:
-                    self._set_json_headers(401)
-                    self.wfile.write(json.dumps({'error': 'User not found'}).encode('utf-8'))
+                    self._send_json(ERR_USER_NOT_FOUND, 401)
                     return
                 
                 # Verify current password
                 if not verify_password(current_password, user['hash'], user['salt']):
-                    self._set_json_headers(401)
-                    self.wfile.write(json.dumps({'error': 'Current password is incorrect'}).encode('utf-8'))
+                    self._send_json({'error': 'Current password is incorrect'}, 401)
                     return
                 
                 # Update password
                 pwd_hash = hash_password(new_password)
-                USERS[username]['hash'] = pwd_hash['hash']
-                USERS[username]['salt'] = pwd_hash['salt']
+                user['hash'] = pwd_hash['hash']
+                user['salt'] = pwd_hash['salt']
                 
                 # Invalidate all sessions except current
-                sessions_to_remove = [t for t, s in SESSIONS.items() if s.get('username') == username and t != token]
-                for t in sessions_to_remove:
-                    del SESSIONS[t]
+                with STATE_LOCK:
+                    others = [t for t in user_session_tokens(username) if t != token]
+                    for t in others:
+                        del SESSIONS[t]
+                    forget_sessions(others)
                 
-                self._set_json_headers()
-                self.wfile.write(json.dumps({
+                self._send_json({
                     'success': True,
                     'message': 'Password changed successfully'
-                }).encode('utf-8'))
+                })
             except json.JSONDecodeError:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8'))
+                self._send_json(ERR_INVALID_JSON, 400)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': 'Password change failed'}).encode('utf-8'))
+                self._send_json({'error': 'Password change failed'}, 500)
             return
         
         # Admin: Create New User Endpoint
         if path == '/api/admin/create-user':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not require_role(session, ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
             
             try:
-                data = json.loads(body)
-                username = sanitize_input(data.get('username', ''), 100).lower()
+                data = json_loads(body)
+                username = sanitize_input(data.get('username', ''), 100, lower=True)
                 name = sanitize_input(data.get('name', ''), 100)
-                email = sanitize_input(data.get('email', ''), 254).lower()
+                email = sanitize_input(data.get('email', ''), 254, lower=True)
                 role = data.get('role', 'customer')
                 password = data.get('password', '')
                 
                 # Validation
                 if not username or not name or not password:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Username, name, and password are required'}).encode('utf-8'))
+                    self._send_json({'error': 'Username, name, and password are required'}, 400)
                     return
                 
-                if role not in ['customer', 'admin', 'underwriter', 'claims', 'accountant']:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid role'}).encode('utf-8'))
+                if not isinstance(role, str) or role not in PORTAL_ROLES:
+                    self._send_json({'error': 'Invalid role'}, 400)
                     return
                 
                 if len(password) < 8:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Password must be at least 8 characters'}).encode('utf-8'))
+                    self._send_json(ERR_PASSWORD_TOO_SHORT, 400)
                     return
                 
                 # Check if user already exists
                 if username in USERS:
-                    self._set_json_headers(409)
-                    self.wfile.write(json.dumps({'error': 'Username already exists'}).encode('utf-8'))
+                    self._send_json({'error': 'Username already exists'}, 409)
                     return
                 
                 # Create customer record if role is customer
@@ -1944,64 +2287,57 @@ class PortalHandler(BaseHTTPRequestHandler):
                     'customer_id': customer_id
                 }
                 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({
+                self._send_json({
                     'success': True,
                     'username': username,
                     'role': role,
                     'customer_id': customer_id,
                     'message': 'User created successfully'
-                }).encode('utf-8'))
+                }, 201)
             except json.JSONDecodeError:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid JSON payload'}).encode('utf-8'))
+                self._send_json(ERR_INVALID_JSON, 400)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': 'User creation failed'}).encode('utf-8'))
+                self._send_json({'error': 'User creation failed'}, 500)
             return
 
         # Admin: Upload actuarial table (JSON or CSV)
         if path == '/api/admin/actuarial-tables/upload':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not require_role(session, ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
 
             try:
                 content_type = (self.headers.get('Content-Type') or '').lower()
                 raw = body
+                now = datetime.now()
+                now_iso = now.isoformat()
                 payload: Dict[str, Any] = {}
 
                 if 'text/csv' in content_type:
                     # CSV upload: first row is headers; store rows as list of dicts
-                    reader = csv.DictReader(io.StringIO(raw))
-                    rows = [r for r in reader]
+                    rows = list(csv.DictReader(io.StringIO(raw.decode('utf-8'))))
                     payload = {
-                        "name": f"CSV Upload {datetime.now().strftime('%Y-%m-%d')}",
+                        "name": f"CSV Upload {now.strftime('%Y-%m-%d')}",
                         "table_type": "pricing",
-                        "version": datetime.now().strftime('%Y%m%d'),
-                        "effective_date": datetime.now().strftime('%Y-%m-%d'),
+                        "version": now.strftime('%Y%m%d'),
+                        "effective_date": now.strftime('%Y-%m-%d'),
                         "data": rows,
                     }
                 else:
-                    payload = json.loads(raw or '{}')
+                    payload = json_loads(raw or '{}')
 
                 name = str(payload.get('name') or '').strip() or 'Actuarial Table'
                 table_type = str(payload.get('table_type') or payload.get('type') or 'pricing').strip().lower()
-                version = str(payload.get('version') or datetime.now().strftime('%Y%m%d')).strip()
+                version = str(payload.get('version') or now.strftime('%Y%m%d')).strip()
                 effective_date = payload.get('effective_date')  # YYYY-MM-DD optional
                 data_obj = payload.get('data')
 
                 if data_obj is None:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Missing data field'}).encode('utf-8'))
+                    self._send_json({'error': 'Missing data field'}, 400)
                     return
 
                 actor = (session or {}).get('username') if session else 'admin'
-                table_id = f"AT-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000,9999)}"
+                table_id = f"AT-{now.strftime('%Y%m%d')}-{id_suffix()}"
 
                 if encrypt_json:
                     blob = encrypt_json(data_obj).to_json()
@@ -2009,14 +2345,12 @@ class PortalHandler(BaseHTTPRequestHandler):
                     blob = json.dumps({"scheme": "plain", "ciphertext": json.dumps(data_obj)})
 
                 if USE_DATABASE and database_enabled:
-                    from database.manager import DatabaseManager
-                    from database.models import ActuarialTable
                     eff_dt = None
                     try:
                         eff_dt = datetime.strptime(str(effective_date), '%Y-%m-%d') if effective_date else None
                     except Exception:
                         eff_dt = None
-                    with DatabaseManager() as db:
+                    with self._db_transaction() as db:
                         row = ActuarialTable(
                             id=table_id,
                             name=name,
@@ -2035,8 +2369,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
 
-                    self._set_json_headers(201)
-                    self.wfile.write(json.dumps({'success': True, 'id': table_id}).encode('utf-8'))
+                    self._send_json({'success': True, 'id': table_id}, 201)
                     return
 
                 with STATE_LOCK:
@@ -2048,7 +2381,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                         "effective_date": effective_date,
                         "classification": "restricted",
                         "created_by": actor,
-                        "created_date": datetime.now().isoformat(),
+                        "created_date": now_iso,
                         "payload": blob,
                     }
 
@@ -2058,21 +2391,15 @@ class PortalHandler(BaseHTTPRequestHandler):
                     except Exception:
                         pass
 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({'success': True, 'id': table_id}).encode('utf-8'))
+                self._send_json({'success': True, 'id': table_id}, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Upload failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Upload failed', 'details': str(e)}, 400)
             return
 
         # Admin: Bulk upload customers (JSON list or CSV)
         if path == '/api/admin/customers/upload':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not require_role(session, ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
 
             try:
@@ -2083,10 +2410,10 @@ class PortalHandler(BaseHTTPRequestHandler):
 
                 rows: list[Dict[str, Any]] = []
                 if 'text/csv' in content_type:
-                    reader = csv.DictReader(io.StringIO(body or ''))
-                    rows = [r for r in reader]
+                    # Parse the whole file up front, outside STATE_LOCK, so a malformed CSV inserts nothing
+                    rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
                 else:
-                    parsed = json.loads(body or '[]')
+                    parsed = json_loads(body or '[]')
                     if isinstance(parsed, dict) and 'items' in parsed:
                         parsed = parsed['items']
                     if not isinstance(parsed, list):
@@ -2094,9 +2421,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                     rows = [dict(r) for r in parsed]
 
                 if USE_DATABASE and database_enabled:
-                    from database.manager import DatabaseManager
-                    from database.models import Customer
-                    with DatabaseManager() as db:
+                    with self._db_transaction() as db:
+                        # DatabaseManager keeps a private session; bind its add() once for the bulk insert.
+                        add = db._ensure_session().add  # type: ignore[attr-defined]
                         for i, r in enumerate(rows):
                             try:
                                 email = str(r.get('email') or '').strip().lower()
@@ -2116,8 +2443,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                                     zip=str(r.get('zip') or '').strip() or None,
                                     occupation=str(r.get('occupation') or '').strip() or None,
                                 )
-                                # DatabaseManager keeps a private session; access it directly for bulk insert.
-                                db._ensure_session().add(cust)  # type: ignore[attr-defined]
+                                add(cust)
                                 created += 1
                             except Exception as e:
                                 errors.append({"row": i, "error": str(e)})
@@ -2128,10 +2454,10 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
 
-                    self._set_json_headers(201)
-                    self.wfile.write(json.dumps({'success': True, 'created': created, 'errors': errors}).encode('utf-8'))
+                    self._send_json({'success': True, 'created': created, 'errors': errors}, 201)
                     return
 
+                created_date = datetime.now().isoformat()
                 with STATE_LOCK:
                     for i, r in enumerate(rows):
                         try:
@@ -2146,7 +2472,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                                 'email': email,
                                 'phone': str(r.get('phone') or '').strip(),
                                 'dob': str(r.get('dob') or '').strip(),
-                                'created_date': datetime.now().isoformat()
+                                'created_date': created_date
                             }
                             created += 1
                         except Exception as e:
@@ -2158,25 +2484,19 @@ class PortalHandler(BaseHTTPRequestHandler):
                     except Exception:
                         pass
 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({'success': True, 'created': created, 'errors': errors}).encode('utf-8'))
+                self._send_json({'success': True, 'created': created, 'errors': errors}, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Upload failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Upload failed', 'details': str(e)}, 400)
             return
 
         # Admin: token registry upsert (enable crypto/NFT/index allow-list)
         if path == '/api/admin/token-registry':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not require_role(session, ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
 
             try:
-                data = json.loads(body or '{}')
+                data = json_loads(body or '{}')
                 symbol = str(data.get('symbol') or '').strip().upper()
                 name = str(data.get('name') or symbol).strip()
                 asset_type = str(data.get('asset_type') or 'currency').strip().lower()
@@ -2187,8 +2507,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                 actor = (session or {}).get('username') if session else 'admin'
 
                 if not symbol:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'symbol required'}).encode('utf-8'))
+                    self._send_json({'error': 'symbol required'}, 400)
                     return
 
                 entry_id = f"TK-{symbol}"
@@ -2196,9 +2515,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                 meta_json = json.dumps(meta) if isinstance(meta, (dict, list)) else (str(meta) if meta else None)
 
                 if USE_DATABASE and database_enabled:
-                    from database.manager import DatabaseManager
-                    from database.models import TokenRegistry
-                    with DatabaseManager() as db:
+                    with self._db_transaction() as db:
                         existing = db.tokens.get_by_symbol(symbol)
                         if existing:
                             existing.name = name
@@ -2230,8 +2547,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
 
-                    self._set_json_headers(201)
-                    self.wfile.write(json.dumps({'success': True, 'id': entry_id}).encode('utf-8'))
+                    self._send_json({'success': True, 'id': entry_id}, 201)
                     return
 
                 with STATE_LOCK:
@@ -2256,39 +2572,29 @@ class PortalHandler(BaseHTTPRequestHandler):
                     except Exception:
                         pass
 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({'success': True, 'id': entry_id}).encode('utf-8'))
+                self._send_json({'success': True, 'id': entry_id}, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Upsert failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Upsert failed', 'details': str(e)}, 400)
             return
 
         # Admin: Seed production data (works with database)
         if path == '/api/admin/seed-data':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            
             # Allow seeding without auth for initial setup (check for secret key)
             data = {}
             try:
-                data = json.loads(body or '{}')
+                data = json_loads(body or '{}')
             except:
                 pass
             
             seed_key = data.get('seed_key', '')
-            is_authorized = require_role(session, ['admin']) or seed_key == 'phins-seed-2024'
+            is_authorized = require_role(session, ADMIN_ROLES) or secrets.compare_digest(str(seed_key).encode('utf-8'), b'phins-seed-2024')
             
             if not is_authorized:
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access or seed_key required.'}).encode('utf-8'))
+                self._send_json({'error': 'Unauthorized. Admin access or seed_key required.'}, 403)
                 return
             
             try:
                 if USE_DATABASE and database_enabled:
-                    from database.seeds import seed_default_users, seed_sample_data
-                    from database import init_database
-                    
                     # Initialize database schema
                     init_database()
                     
@@ -2304,44 +2610,35 @@ class PortalHandler(BaseHTTPRequestHandler):
                     except Exception as e:
                         print(f"Sample data seeding note: {e}")
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'success': True,
                         'message': 'Database seeded successfully',
                         'accounts': {
                             'admin': {'username': 'admin', 'password': 'admin123'},
                             'customer': {'email': 'asaf@assurance.co.il', 'password': 'Assurance2024!'}
                         }
-                    }).encode('utf-8'))
+                    })
                 else:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Database mode not enabled'}).encode('utf-8'))
+                    self._send_json({'error': 'Database mode not enabled'}, 400)
             except Exception as e:
-                self._set_json_headers(500)
-                self.wfile.write(json.dumps({'error': f'Seeding failed: {str(e)}'}).encode('utf-8'))
+                self._send_json({'error': f'Seeding failed: {str(e)}'}, 500)
             return
 
         # Admin: reset demo dataset (in-memory only)
         if path == '/api/admin/reset-demo-data':
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-            if not require_role(session, ['admin']):
-                self._set_json_headers(403)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Admin access required.'}).encode('utf-8'))
+            if not require_role(session, ADMIN_ROLES):
+                self._send_json(ERR_ADMIN_REQUIRED, 403)
                 return
 
             try:
-                data = json.loads(body or '{}')
+                data = json_loads(body or '{}')
                 confirm = str(data.get('confirm') or '').lower() in ('true', '1', 'yes')
                 if not confirm:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'confirm=true required'}).encode('utf-8'))
+                    self._send_json({'error': 'confirm=true required'}, 400)
                     return
 
                 if USE_DATABASE and database_enabled:
-                    self._set_json_headers(501)
-                    self.wfile.write(json.dumps({'error': 'DB reset is disabled by default. Use init_database(drop_existing=True) offline.'}).encode('utf-8'))
+                    self._send_json({'error': 'DB reset is disabled by default. Use init_database(drop_existing=True) offline.'}, 501)
                     return
 
                 with STATE_LOCK:
@@ -2354,8 +2651,10 @@ class PortalHandler(BaseHTTPRequestHandler):
                     TOKEN_REGISTRY.clear()
 
                     # Seed a minimal working dataset
+                    now = datetime.now()
+                    now_iso = now.isoformat()
                     cust_id = generate_customer_id()
-                    CUSTOMERS[cust_id] = {'id': cust_id, 'name': 'Demo Customer', 'email': 'demo.customer@phins.ai', 'phone': '555-0100', 'dob': '1990-01-01', 'created_date': datetime.now().isoformat()}
+                    CUSTOMERS[cust_id] = {'id': cust_id, 'name': 'Demo Customer', 'email': 'demo.customer@phins.ai', 'phone': '555-0100', 'dob': '1990-01-01', 'created_date': now_iso}
                     pol_id = generate_policy_id()
                     prem = calculate_premium({'type': 'life', 'age': 35, 'coverage_amount': 250000, 'risk_score': 'medium'})
                     POLICIES[pol_id] = {
@@ -2367,37 +2666,37 @@ class PortalHandler(BaseHTTPRequestHandler):
                         'monthly_premium': prem['monthly'],
                         'status': 'active',
                         'risk_score': 'medium',
-                        'created_date': datetime.now().isoformat(),
-                        'start_date': datetime.now().isoformat(),
+                        'created_date': now_iso,
+                        'start_date': now_iso,
                     }
-                    uw_id = f"UW-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000,9999)}"
+                    uw_id = f"UW-{now.strftime('%Y%m%d')}-{id_suffix()}"
                     UNDERWRITING_APPLICATIONS[uw_id] = {
                         'id': uw_id,
                         'policy_id': pol_id,
                         'customer_id': cust_id,
                         'status': 'approved',
                         'risk_assessment': 'medium',
-                        'submitted_date': datetime.now().isoformat(),
-                        'decision_date': datetime.now().isoformat(),
+                        'submitted_date': now_iso,
+                        'decision_date': now_iso,
                     }
-                    bill_id = f"BILL-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000,9999)}"
-                    BILLING[bill_id] = {'bill_id': bill_id, 'policy_id': pol_id, 'amount_due': prem['monthly'], 'amount_paid': 0.0, 'status': 'outstanding', 'created_date': datetime.now().isoformat(), 'due_date': (datetime.now() + timedelta(days=30)).isoformat()}
+                    bill_id = f"BILL-{now.strftime('%Y%m%d')}-{id_suffix()}"
+                    BILLING[bill_id] = {'bill_id': bill_id, 'policy_id': pol_id, 'amount_due': prem['monthly'], 'amount_paid': 0.0, 'status': 'outstanding', 'created_date': now_iso, 'due_date': (now + timedelta(days=30)).isoformat()}
 
                     # Seed a basic token registry
-                    TOKEN_REGISTRY['TK-BTC'] = {'id': 'TK-BTC', 'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'currency', 'enabled': True, 'classification': 'internal', 'created_by': 'system', 'created_date': datetime.now().isoformat()}
-                    TOKEN_REGISTRY['TK-ETH'] = {'id': 'TK-ETH', 'symbol': 'ETH', 'name': 'Ethereum', 'asset_type': 'currency', 'enabled': True, 'classification': 'internal', 'created_by': 'system', 'created_date': datetime.now().isoformat()}
+                    TOKEN_REGISTRY['TK-BTC'] = {'id': 'TK-BTC', 'symbol': 'BTC', 'name': 'Bitcoin', 'asset_type': 'currency', 'enabled': True, 'classification': 'internal', 'created_by': 'system', 'created_date': now_iso}
+                    TOKEN_REGISTRY['TK-ETH'] = {'id': 'TK-ETH', 'symbol': 'ETH', 'name': 'Ethereum', 'asset_type': 'currency', 'enabled': True, 'classification': 'internal', 'created_by': 'system', 'created_date': now_iso}
 
-                self._set_json_headers(200)
-                self.wfile.write(json.dumps({'success': True}).encode('utf-8'))
+                self._send_json({'success': True})
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Reset failed', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Reset failed', 'details': str(e)}, 400)
             return
         
         # Create Policy Endpoint
         if path == '/api/policies/create':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
+                now = datetime.now()
+                now_iso = now.isoformat()
                 
                 # Validate and sanitize inputs
                 customer_name = sanitize_input(data.get('customer_name', ''), 100)
@@ -2405,22 +2704,18 @@ class PortalHandler(BaseHTTPRequestHandler):
                 customer_phone = sanitize_input(data.get('customer_phone', ''), 20)
                 
                 if not customer_name:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Customer name is required'}).encode('utf-8'))
+                    self._send_json({'error': 'Customer name is required'}, 400)
                     return
                 
                 if customer_email and not validate_email(customer_email):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid email format'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_EMAIL, 400)
                     return
                 
                 coverage_amount = data.get('coverage_amount', 100000)
                 if not validate_amount(coverage_amount):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid coverage amount'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_COVERAGE, 400)
                     return
                 
-                policy_id = generate_policy_id()
                 customer_id = data.get('customer_id') or generate_customer_id()
                 
                 # Create customer if new
@@ -2431,10 +2726,10 @@ class PortalHandler(BaseHTTPRequestHandler):
                         'email': customer_email,
                         'phone': customer_phone,
                         'dob': data.get('customer_dob', ''),
-                        'created_date': datetime.now().isoformat()
+                        'created_date': now_iso
                     }
                     # Provision portal login for the customer
-                    cust_email = CUSTOMERS[customer_id].get('email') or f"{customer_id.lower()}@example.com"
+                    cust_email = customer_email or f"{customer_id.lower()}@example.com"
                     temp_password = f"pw-{uuid.uuid4().hex[:10]}"
                     
                     # Hash the password for security
@@ -2443,78 +2738,54 @@ class PortalHandler(BaseHTTPRequestHandler):
                         'hash': pwd_hash['hash'],
                         'salt': pwd_hash['salt'],
                         'role': 'customer',
-                        'name': CUSTOMERS[customer_id].get('name') or customer_id,
+                        'name': customer_name,
                         'customer_id': customer_id
                     }
                 
-                # Create underwriting application
-                uw_id = f"UW-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
-                UNDERWRITING_APPLICATIONS[uw_id] = {
-                    'id': uw_id,
-                    'policy_id': policy_id,
-                    'customer_id': customer_id,
-                    'status': 'pending',
-                    'questionnaire_responses': data.get('questionnaire', {}),
-                    'risk_assessment': data.get('risk_score', 'medium'),
-                    'medical_exam_required': data.get('medical_exam_required', False),
-                    'submitted_date': datetime.now().isoformat()
-                }
-                
-                # Calculate premium
-                premium_data = calculate_premium(data)
-                
-                # Create policy
-                policy = {
-                    'id': policy_id,
-                    'customer_id': customer_id,
-                    'type': data.get('type', 'life'),
-                    'coverage_amount': data.get('coverage_amount', 100000),
-                    'annual_premium': premium_data['annual'],
-                    'monthly_premium': premium_data['monthly'],
-                    'status': 'pending_underwriting',
-                    'underwriting_id': uw_id,
-                    'risk_score': data.get('risk_score', 'medium'),
-                    'start_date': data.get('start_date', datetime.now().isoformat()),
-                    'end_date': data.get('end_date', (datetime.now() + timedelta(days=365)).isoformat()),
-                    'created_date': datetime.now().isoformat()
-                }
-                
-                POLICIES[policy_id] = policy
+                # Create the policy and its underwriting application
+                policy = create_pending_policy(
+                    customer_id, data.get('type', 'life'), coverage_amount, data.get('risk_score', 'medium'),
+                    calculate_premium(data), now,
+                    application={
+                        'questionnaire_responses': data.get('questionnaire', {}),
+                        'medical_exam_required': data.get('medical_exam_required', False),
+                    },
+                    start_date=data.get('start_date'), end_date=data.get('end_date'))
+                policy_id = policy['id']
                 if audit:
-                    actor = session.get('username') if 'session' in locals() and session else 'system'
+                    actor = session.get('username') if session else 'system'
                     try:
                         audit.log(actor, 'create', 'policy', policy_id, {'customer_id': customer_id, 'coverage_amount': policy.get('coverage_amount')})
                     except Exception:
                         pass
                 
-                self._set_json_headers(201)
-                
                 # Return temp_password (stored in closure before hashing)
-                login_username = CUSTOMERS[customer_id].get('email') or f"{customer_id.lower()}@example.com"
-                self.wfile.write(json.dumps({
+                customer = CUSTOMERS[customer_id]
+                login_username = customer.get('email') or f"{customer_id.lower()}@example.com"
+                self._send_json({
                     'policy': policy,
-                    'underwriting': UNDERWRITING_APPLICATIONS[uw_id],
-                    'customer': CUSTOMERS[customer_id],
+                    'underwriting': UNDERWRITING_APPLICATIONS[policy['underwriting_id']],
+                    'customer': customer,
                     'provisioned_login': {
                         'username': login_username,
                         'password': temp_password  # Return plain password for first login
                     }
-                }).encode('utf-8'))
+                }, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
 
         # Create Policy (Safe Minimal) Endpoint
         if path == '/api/policies/create_simple':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
+                now = datetime.now()
+                now_iso = now.isoformat()
                 customer_id = data.get('customer_id') or generate_customer_id()
                 policy_type = data.get('type', 'life')
                 coverage_amount = data.get('coverage_amount', 100000)
                 if not validate_amount(coverage_amount):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid coverage amount'}).encode('utf-8'))
+                    self._send_json(ERR_INVALID_COVERAGE, 400)
                     return
                 # Upsert minimal customer record if needed
                 if customer_id not in CUSTOMERS:
@@ -2522,66 +2793,39 @@ class PortalHandler(BaseHTTPRequestHandler):
                         'id': customer_id,
                         'name': data.get('customer_name') or customer_id,
                         'email': data.get('customer_email', ''),
-                        'created_date': datetime.now().isoformat()
+                        'created_date': now_iso
                     }
-                # Generate IDs
-                policy_id = generate_policy_id()
-                uw_id = f"UW-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
-                # Underwriting minimal record
-                UNDERWRITING_APPLICATIONS[uw_id] = {
-                    'id': uw_id,
-                    'policy_id': policy_id,
-                    'customer_id': customer_id,
-                    'status': 'pending',
-                    'risk_assessment': data.get('risk_score', 'medium'),
-                    'submitted_date': datetime.now().isoformat()
-                }
-                # Premium calc
+                risk_score = data.get('risk_score', 'medium')
                 premium_data = calculate_premium({
                     'type': policy_type,
                     'coverage_amount': coverage_amount,
                     'age': data.get('age', 30),
-                    'risk_score': data.get('risk_score', 'medium')
+                    'risk_score': risk_score
                 })
-                # Create policy
-                policy = {
-                    'id': policy_id,
-                    'customer_id': customer_id,
-                    'type': policy_type,
-                    'coverage_amount': coverage_amount,
-                    'annual_premium': premium_data['annual'],
-                    'monthly_premium': premium_data['monthly'],
-                    'status': 'pending_underwriting',
-                    'underwriting_id': uw_id,
-                    'risk_score': data.get('risk_score', 'medium'),
-                    'start_date': datetime.now().isoformat(),
-                    'end_date': (datetime.now() + timedelta(days=365)).isoformat(),
-                    'created_date': datetime.now().isoformat()
-                }
-                POLICIES[policy_id] = policy
+                policy = create_pending_policy(customer_id, policy_type, coverage_amount, risk_score, premium_data, now)
                 if audit:
                     actor = 'system'
                     try:
-                        audit.log(actor, 'create', 'policy', policy_id, {'customer_id': customer_id, 'safe': True})
+                        audit.log(actor, 'create', 'policy', policy['id'], {'customer_id': customer_id, 'safe': True})
                     except Exception:
                         pass
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({'policy': policy, 'underwriting': UNDERWRITING_APPLICATIONS[uw_id], 'customer': CUSTOMERS[customer_id]}).encode('utf-8'))
+                self._send_json({'policy': policy, 'underwriting': UNDERWRITING_APPLICATIONS[policy['underwriting_id']], 'customer': CUSTOMERS[customer_id]}, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid request', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Invalid request', 'details': str(e)}, 400)
             return
         
         # Approve Underwriting Endpoint
         if path == '/api/underwriting/approve':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
+                now = datetime.now()
+                now_iso = now.isoformat()
                 uw_id = data.get('id')
                 app = UNDERWRITING_APPLICATIONS.get(uw_id)
                 
                 if app:
                     app['status'] = 'approved'
-                    app['decision_date'] = datetime.now().isoformat()
+                    app['decision_date'] = now_iso
                     app['approved_by'] = data.get('approved_by', 'admin')
                     
                     # Update policy status to ACTIVE
@@ -2592,10 +2836,10 @@ class PortalHandler(BaseHTTPRequestHandler):
                     if policy_id and policy_id in POLICIES:
                         policy = POLICIES[policy_id]
                         policy['status'] = 'active'
-                        policy['approval_date'] = datetime.now().isoformat()
+                        policy['approval_date'] = now_iso
                         
                         # Auto-generate billing record for active policy
-                        bill_id = f"BILL-{datetime.now().strftime('%Y%m%d%H%M%S')}-{random.randint(1000,9999)}"
+                        bill_id = f"BILL-{now.strftime('%Y%m%d%H%M%S')}-{id_suffix()}"
                         monthly_premium = policy.get('monthly_premium', 0) or policy.get('annual_premium', 0) / 12
                         
                         bill = {
@@ -2607,9 +2851,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                             'amount_due': round(float(monthly_premium), 2),
                             'amount_paid': 0.0,
                             'status': 'outstanding',
-                            'due_date': (datetime.now() + timedelta(days=30)).isoformat(),
-                            'created_date': datetime.now().isoformat(),
-                            'updated_date': datetime.now().isoformat(),
+                            'due_date': (now + timedelta(days=30)).isoformat(),
+                            'created_date': now_iso,
+                            'updated_date': now_iso,
                             'description': f"Initial premium for policy {policy_id}"
                         }
                         BILLING[bill_id] = bill
@@ -2635,26 +2879,23 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'success': True,
                         'application': app,
                         'policy_status': 'active',
                         'bill_id': bill_id,
                         'message': 'Policy approved and activated. Initial billing generated.'
-                    }).encode('utf-8'))
+                    })
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Application not found'}).encode('utf-8'))
+                    self._send_json(ERR_APPLICATION_NOT_FOUND, 404)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Reject Underwriting Endpoint
         if path == '/api/underwriting/reject':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 uw_id = data.get('id')
                 app = UNDERWRITING_APPLICATIONS.get(uw_id)
                 
@@ -2674,26 +2915,18 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'success': True, 'application': app}).encode('utf-8'))
+                    self._send_json({'success': True, 'application': app})
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Application not found'}).encode('utf-8'))
+                    self._send_json(ERR_APPLICATION_NOT_FOUND, 404)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Create Claim Endpoint
         if path == '/api/claims/create':
-            # Resolve session (customers must be authenticated to create claims)
-            auth_header = self.headers.get('Authorization', '')
-            token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
-            session = validate_session(token) if token else None
-
+            # Customers must be authenticated to create claims
             if not session:
-                self._set_json_headers(401)
-                self.wfile.write(json.dumps({'error': 'Unauthorized. Please login.'}).encode('utf-8'))
+                self._send_json(ERR_LOGIN_REQUIRED, 401)
                 return
 
             user = get_session_user(session) or {}
@@ -2701,19 +2934,17 @@ class PortalHandler(BaseHTTPRequestHandler):
             session_customer_id = user.get('customer_id') or session.get('customer_id')
 
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 claim_id = generate_claim_id()
 
                 # If customer, force customer_id to session and verify policy ownership
                 if role == 'customer':
                     if not session_customer_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id unavailable'}).encode('utf-8'))
+                        self._send_json(ERR_CUSTOMER_ID_UNAVAILABLE, 400)
                         return
                     policy_id = data.get('policy_id')
                     if policy_id and POLICIES.get(policy_id, {}).get('customer_id') != session_customer_id:
-                        self._set_json_headers(403)
-                        self.wfile.write(json.dumps({'error': 'Forbidden'}).encode('utf-8'))
+                        self._send_json(ERR_FORBIDDEN, 403)
                         return
                     data['customer_id'] = session_customer_id
                 
@@ -2737,17 +2968,15 @@ class PortalHandler(BaseHTTPRequestHandler):
                     except Exception:
                         pass
                 
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps(claim).encode('utf-8'))
+                self._send_json(claim, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Approve Claim Endpoint
         if path == '/api/claims/approve':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 claim_id = data.get('id')
                 claim = CLAIMS.get(claim_id)
                 
@@ -2764,20 +2993,17 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'success': True, 'claim': claim}).encode('utf-8'))
+                    self._send_json({'success': True, 'claim': claim})
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Claim not found'}).encode('utf-8'))
+                    self._send_json(ERR_CLAIM_NOT_FOUND, 404)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Reject Claim Endpoint
         if path == '/api/claims/reject':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 claim_id = data.get('id')
                 claim = CLAIMS.get(claim_id)
                 
@@ -2792,28 +3018,26 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'success': True, 'claim': claim}).encode('utf-8'))
+                    self._send_json({'success': True, 'claim': claim})
                 else:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Claim not found'}).encode('utf-8'))
+                    self._send_json(ERR_CLAIM_NOT_FOUND, 404)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Pay Claim Endpoint
         if path == '/api/claims/pay':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 claim_id = data.get('id')
                 claim = CLAIMS.get(claim_id)
                 
                 if claim and claim['status'] == 'approved':
+                    now = datetime.now()
                     claim['status'] = 'paid'
-                    claim['payment_date'] = datetime.now().isoformat()
+                    claim['payment_date'] = now.isoformat()
                     claim['payment_method'] = data.get('payment_method', 'bank_transfer')
-                    claim['payment_reference'] = f"PAY-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+                    claim['payment_reference'] = f"PAY-{now.strftime('%Y%m%d')}-{id_suffix()}"
                     claim['paid_amount'] = claim.get('approved_amount', claim['claimed_amount'])
                     if audit:
                         actor = data.get('processed_by', 'accountant')
@@ -2822,29 +3046,23 @@ class PortalHandler(BaseHTTPRequestHandler):
                         except Exception:
                             pass
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'success': True, 'claim': claim}).encode('utf-8'))
+                    self._send_json({'success': True, 'claim': claim})
                 else:
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Claim not approved or not found'}).encode('utf-8'))
+                    self._send_json({'error': 'Claim not approved or not found'}, 400)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # Email validation endpoint
         if path == '/api/validate-email':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 email = data.get('email', '')
                 # Simple validation
-                import re
-                is_valid = re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email) is not None
-                self._set_json_headers()
-                self.wfile.write(json.dumps({'valid': is_valid}).encode('utf-8'))
+                is_valid = len(email) <= MAX_EMAIL_LENGTH and LOOSE_EMAIL_PATTERN.match(email) is not None
+                self._send_json({'valid': is_valid})
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                self._send_json({'error': str(e)}, 400)
             return
         
         # ========== BILLING API ENDPOINTS ==========
@@ -2852,25 +3070,22 @@ class PortalHandler(BaseHTTPRequestHandler):
             # Add payment method
             if path == '/api/billing/payment-method':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     customer_id = data.get('customer_id')
                     if not customer_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id required'}).encode('utf-8'))
+                        self._send_json(ERR_CUSTOMER_ID_REQUIRED, 400)
                         return
                     
                     result = billing_engine.add_payment_method(customer_id, data)
-                    self._set_json_headers(200 if result['success'] else 400)
-                    self.wfile.write(json.dumps(result).encode('utf-8'))
+                    self._send_json(result, 200 if result['success'] else 400)
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'success': False, 'error': str(e)}).encode('utf-8'))
+                    self._send_json({'success': False, 'error': str(e)}, 500)
                 return
             
             # Process payment/charge
             if path == '/api/billing/charge':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     customer_id = data.get('customer_id')
                     amount = float(data.get('amount', 0))
                     policy_id = data.get('policy_id')
@@ -2879,8 +3094,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                     crypto_amount = data.get('crypto_amount')
                     
                     if not customer_id or not policy_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id and policy_id required'}).encode('utf-8'))
+                        self._send_json({'error': 'customer_id and policy_id required'}, 400)
                         return
 
                     fx_rate = None
@@ -2889,8 +3103,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                         allowed = False
                         if USE_DATABASE and database_enabled:
                             try:
-                                from database.manager import DatabaseManager
-                                with DatabaseManager() as db:
+                                with self._db_transaction() as db:
                                     entry = db.tokens.get_by_symbol(currency)
                                     allowed = bool(entry and entry.enabled)
                             except Exception:
@@ -2900,20 +3113,17 @@ class PortalHandler(BaseHTTPRequestHandler):
                                 allowed = any(v.get('symbol') == currency and v.get('enabled', True) for v in TOKEN_REGISTRY.values())
 
                         if not allowed:
-                            self._set_json_headers(400)
-                            self.wfile.write(json.dumps({'error': f'Currency {currency} is not enabled'}).encode('utf-8'))
+                            self._send_json({'error': f'Currency {currency} is not enabled'}, 400)
                             return
 
                         # Fetch USD spot price for currency and validate
                         if not _market_data:
-                            self._set_json_headers(503)
-                            self.wfile.write(json.dumps({'error': 'Market data service unavailable'}).encode('utf-8'))
+                            self._send_json(ERR_MARKET_DATA_UNAVAILABLE, 503)
                             return
 
                         prices = _market_data.get_crypto_prices_usd([currency]).get('prices', {})
                         if currency not in prices or not prices[currency]:
-                            self._set_json_headers(502)
-                            self.wfile.write(json.dumps({'error': f'No USD price available for {currency}'}).encode('utf-8'))
+                            self._send_json({'error': f'No USD price available for {currency}'}, 502)
                             return
                         fx_rate = float(prices[currency])
 
@@ -2922,8 +3132,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                             try:
                                 crypto_amount_f = float(crypto_amount)
                             except Exception:
-                                self._set_json_headers(400)
-                                self.wfile.write(json.dumps({'error': 'crypto_amount must be numeric'}).encode('utf-8'))
+                                self._send_json({'error': 'crypto_amount must be numeric'}, 400)
                                 return
                             amount = crypto_amount_f * fx_rate
                     
@@ -2941,41 +3150,35 @@ class PortalHandler(BaseHTTPRequestHandler):
                         fx_rate_to_usd=fx_rate,
                     )
                     
-                    self._set_json_headers(200 if result['success'] else 400)
-                    self.wfile.write(json.dumps(result).encode('utf-8'))
+                    self._send_json(result, 200 if result['success'] else 400)
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'success': False, 'error': str(e)}).encode('utf-8'))
+                    self._send_json({'success': False, 'error': str(e)}, 500)
                 return
             
             # Get billing history
             if path == '/api/billing/history':
                 try:
-                    data = json.loads(body) if body else {}
+                    data = json_loads(body) if body else {}
                     customer_id = data.get('customer_id')
                     
                     if not customer_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id required'}).encode('utf-8'))
+                        self._send_json(ERR_CUSTOMER_ID_REQUIRED, 400)
                         return
                     
                     transactions = billing_engine.get_customer_transactions(customer_id)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'transactions': transactions}).encode('utf-8'))
+                    self._send_json({'transactions': transactions})
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Get billing statement
             if path == '/api/billing/statement':
                 try:
-                    data = json.loads(body) if body else {}
+                    data = json_loads(body) if body else {}
                     customer_id = data.get('customer_id')
                     
                     if not customer_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id required'}).encode('utf-8'))
+                        self._send_json(ERR_CUSTOMER_ID_REQUIRED, 400)
                         return
                     
                     statement = billing_engine.get_billing_statement(
@@ -2983,83 +3186,71 @@ class PortalHandler(BaseHTTPRequestHandler):
                         data.get('start_date'),
                         data.get('end_date')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(statement).encode('utf-8'))
+                    self._send_json(statement)
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Process refund
             if path == '/api/billing/refund':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     transaction_id = data.get('transaction_id')
                     amount = data.get('amount')
                     reason = data.get('reason')
                     
                     if not transaction_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'transaction_id required'}).encode('utf-8'))
+                        self._send_json({'error': 'transaction_id required'}, 400)
                         return
                     
                     result = billing_engine.refund_payment(transaction_id, amount, reason)
-                    self._set_json_headers(200 if result['success'] else 400)
-                    self.wfile.write(json.dumps(result).encode('utf-8'))
+                    self._send_json(result, 200 if result['success'] else 400)
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'success': False, 'error': str(e)}).encode('utf-8'))
+                    self._send_json({'success': False, 'error': str(e)}, 500)
                 return
             
             # Get fraud alerts (admin only)
             if path == '/api/billing/fraud-alerts':
                 try:
-                    data = json.loads(body) if body else {}
+                    data = json_loads(body) if body else {}
                     alerts = billing_engine.get_fraud_alerts(
                         severity=data.get('severity'),
                         status=data.get('status')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'alerts': alerts}).encode('utf-8'))
+                    self._send_json({'alerts': alerts})
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Get payment methods
             if path == '/api/billing/payment-methods':
                 try:
-                    data = json.loads(body) if body else {}
+                    data = json_loads(body) if body else {}
                     customer_id = data.get('customer_id')
                     
                     if not customer_id:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'customer_id required'}).encode('utf-8'))
+                        self._send_json(ERR_CUSTOMER_ID_REQUIRED, 400)
                         return
                     
                     methods = billing_engine.get_payment_methods(customer_id)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'payment_methods': methods}).encode('utf-8'))
+                    self._send_json({'payment_methods': methods})
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Validate card number (enhanced with Mastercard 16-digit check)
             if path == '/api/billing/validate-card':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     card_number = data.get('card_number', '')
                     expected_type = data.get('card_type')
                     
                     # Use enhanced SecurityValidator
                     validation_result = SecurityValidator.validate_card_number(card_number, expected_type)
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(validation_result).encode('utf-8'))
+                    self._send_json(validation_result)
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'valid': False, 'errors': [str(e)]}).encode('utf-8'))
+                    self._send_json({'valid': False, 'errors': [str(e)]}, 500)
                 return
             
             # Get billing stats for dashboard
@@ -3068,21 +3259,19 @@ class PortalHandler(BaseHTTPRequestHandler):
                     # Calculate real stats from BILLING data
                     bills = list(BILLING.values())
                     total_transactions = len(bills)
-                    successful = len([b for b in bills if b.get('status') in ['paid', 'partial']])
+                    successful = len([b for b in bills if b.get('status') in BILL_COLLECTED_STATUSES])
                     failed = len([b for b in bills if b.get('status') == 'failed'])
                     total_revenue = sum(float(b.get('amount_paid', 0)) for b in bills)
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'total_transactions': total_transactions,
                         'successful_payments': successful,
                         'failed_payments': failed,
                         'total_revenue': round(total_revenue, 2),
                         'pending_alerts': 0
-                    }).encode('utf-8'))
+                    })
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Get recent transactions
@@ -3100,47 +3289,35 @@ class PortalHandler(BaseHTTPRequestHandler):
                             'payment_method': bill.get('payment_method', '****-****-****-****')
                         })
                     
-                    # Sort by timestamp desc and limit to 50
-                    transactions.sort(key=lambda x: x['timestamp'], reverse=True)
-                    transactions = transactions[:50]
+                    # Most recent 50 by timestamp (partial selection, no full sort)
+                    transactions = heapq.nlargest(50, transactions, key=itemgetter('timestamp'))
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({'transactions': transactions}).encode('utf-8'))
+                    self._send_json({'transactions': transactions})
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
         
         # ========== PAYMENT GATEWAY API (PayPal, Stripe, Crypto) ==========
-        # Import payment gateway service
-        try:
-            from services.payment_gateway_service import get_payment_gateway, PaymentResult
-            payment_gateway = get_payment_gateway(test_mode=True, market_data_service=_market_data)
-            payment_gateway_enabled = True
-        except ImportError:
-            payment_gateway_enabled = False
-            payment_gateway = None
+        payment_gateway = get_payment_gateway(test_mode=True, market_data_service=_market_data) if get_payment_gateway else None
         
-        if payment_gateway_enabled:
+        if payment_gateway is not None:
             # Get available payment methods
             if path == '/api/payment/methods':
                 try:
                     methods = payment_gateway.get_available_methods()
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'success': True,
                         'methods': methods,
                         'test_mode': payment_gateway.test_mode
-                    }).encode('utf-8'))
+                    })
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Process payment (unified endpoint)
             if path == '/api/payment/process':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     method = data.get('method', 'credit_card')
                     amount = float(data.get('amount', 0))
                     currency = data.get('currency', 'USD')
@@ -3148,8 +3325,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                     policy_id = data.get('policy_id')
                     
                     if amount <= 0:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': 'Amount must be positive'}).encode('utf-8'))
+                        self._send_json({'error': 'Amount must be positive'}, 400)
                         return
                     
                     # Process payment through unified gateway
@@ -3171,7 +3347,7 @@ class PortalHandler(BaseHTTPRequestHandler):
                     if result.success and result.status == 'completed' and policy_id:
                         # Find and update billing record
                         for bill_id, bill in BILLING.items():
-                            if bill.get('policy_id') == policy_id and bill.get('status') in ['outstanding', 'partial']:
+                            if bill.get('policy_id') == policy_id and bill.get('status') in BILL_OUTSTANDING_STATUSES:
                                 bill['amount_paid'] = float(bill.get('amount_paid', 0)) + amount
                                 if bill['amount_paid'] >= float(bill.get('amount_due', 0)):
                                     bill['status'] = 'paid'
@@ -3182,75 +3358,65 @@ class PortalHandler(BaseHTTPRequestHandler):
                                 bill['updated_date'] = datetime.now().isoformat()
                                 break
                     
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'success': False, 'error': str(e)}).encode('utf-8'))
+                    self._send_json({'success': False, 'error': str(e)}, 500)
                 return
             
             # PayPal specific endpoints
             if path == '/api/payment/paypal/create':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     amount = float(data.get('amount', 0))
                     result = payment_gateway.paypal.create_order(
                         amount=amount,
                         currency=data.get('currency', 'USD'),
                         description=data.get('description', 'Insurance Premium')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             if path.startswith('/api/payment/paypal/capture/'):
                 try:
                     order_id = path.split('/')[-1]
                     result = payment_gateway.paypal.capture_order(order_id)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Apple Pay session
             if path == '/api/payment/apple-pay/session':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     result = payment_gateway.stripe.create_apple_pay_session(
                         amount=float(data.get('amount', 0)),
                         currency=data.get('currency', 'USD')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Google Pay session
             if path == '/api/payment/google-pay/session':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     result = payment_gateway.stripe.create_google_pay_session(
                         amount=float(data.get('amount', 0)),
                         currency=data.get('currency', 'USD')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Crypto payment request
             if path == '/api/payment/crypto/create':
                 try:
-                    data = json.loads(body)
+                    data = json_loads(body)
                     amount = float(data.get('amount', 0))
                     crypto = data.get('crypto', 'BTC').upper()
                     
@@ -3260,11 +3426,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                         customer_id=data.get('customer_id'),
                         policy_id=data.get('policy_id')
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Check crypto payment status
@@ -3272,11 +3436,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                 try:
                     payment_id = path.split('/')[-1]
                     result = payment_gateway.crypto.check_payment_status(payment_id)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Simulate crypto payment (for testing)
@@ -3284,11 +3446,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                 try:
                     payment_id = path.split('/')[-1]
                     result = payment_gateway.simulate_crypto_confirmation(payment_id)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Payment status check
@@ -3297,17 +3457,15 @@ class PortalHandler(BaseHTTPRequestHandler):
                     transaction_id = path.split('/')[-1]
                     method = parsed_url.query and urllib.parse.parse_qs(parsed_url.query).get('method', [None])[0]
                     result = payment_gateway.check_status(transaction_id, method)
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps(result.to_dict()).encode('utf-8'))
+                    self._send_json(result.to_dict())
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
             
             # Transaction history
             if path == '/api/payment/history':
                 try:
-                    data = json.loads(body) if body else {}
+                    data = json_loads(body) if body else {}
                     customer_id = data.get('customer_id')
                     limit = int(data.get('limit', 50))
                     
@@ -3315,15 +3473,13 @@ class PortalHandler(BaseHTTPRequestHandler):
                         customer_id=customer_id,
                         limit=limit
                     )
-                    self._set_json_headers()
-                    self.wfile.write(json.dumps({
+                    self._send_json({
                         'success': True,
                         'transactions': transactions,
                         'test_mode': payment_gateway.test_mode
-                    }).encode('utf-8'))
+                    })
                 except Exception as e:
-                    self._set_json_headers(500)
-                    self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
+                    self._send_json({'error': str(e)}, 500)
                 return
         # ========== END PAYMENT GATEWAY API ==========
         
@@ -3331,23 +3487,23 @@ class PortalHandler(BaseHTTPRequestHandler):
         # Minimal billing endpoints (demo fallback when engine routes are not used)
         if path == '/api/billing/create':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 policy_id = data.get('policy_id')
                 amount_due = float(data.get('amount_due', 0))
                 due_days = int(data.get('due_days', 30))
                 if not policy_id or not validate_amount(amount_due):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'policy_id and valid amount_due required'}).encode('utf-8'))
+                    self._send_json({'error': 'policy_id and valid amount_due required'}, 400)
                     return
-                bill_id = f"BILL-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000,9999)}"
+                now = datetime.now()
+                bill_id = f"BILL-{now.strftime('%Y%m%d')}-{id_suffix()}"
                 bill = {
                     'bill_id': bill_id,
                     'policy_id': policy_id,
                     'amount_due': amount_due,
                     'amount_paid': 0.0,
                     'status': 'outstanding',
-                    'created_date': datetime.now().isoformat(),
-                    'due_date': (datetime.now() + timedelta(days=due_days)).isoformat()
+                    'created_date': now.isoformat(),
+                    'due_date': (now + timedelta(days=due_days)).isoformat()
                 }
                 BILLING[bill_id] = bill
                 if audit:
@@ -3355,26 +3511,22 @@ class PortalHandler(BaseHTTPRequestHandler):
                         audit.log('system', 'create', 'bill', bill_id, {'policy_id': policy_id, 'amount_due': amount_due})
                     except Exception:
                         pass
-                self._set_json_headers(201)
-                self.wfile.write(json.dumps({'bill': bill}).encode('utf-8'))
+                self._send_json({'bill': bill}, 201)
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid request', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Invalid request', 'details': str(e)}, 400)
             return
 
         if path == '/api/billing/pay':
             try:
-                data = json.loads(body)
+                data = json_loads(body)
                 bill_id = data.get('bill_id')
                 amount = float(data.get('amount', 0))
                 bill = BILLING.get(bill_id)
                 if not bill:
-                    self._set_json_headers(404)
-                    self.wfile.write(json.dumps({'error': 'Bill not found'}).encode('utf-8'))
+                    self._send_json(ERR_BILL_NOT_FOUND, 404)
                     return
                 if not validate_amount(amount):
-                    self._set_json_headers(400)
-                    self.wfile.write(json.dumps({'error': 'Invalid amount'}).encode('utf-8'))
+                    self._send_json({'error': 'Invalid amount'}, 400)
                     return
                 bill['amount_paid'] = bill.get('amount_paid', 0.0) + amount
                 if bill['amount_paid'] >= bill['amount_due']:
@@ -3387,11 +3539,9 @@ class PortalHandler(BaseHTTPRequestHandler):
                         audit.log('system', 'update', 'bill', bill_id, {'paid': amount, 'status': bill['status']})
                     except Exception:
                         pass
-                self._set_json_headers(200)
-                self.wfile.write(json.dumps({'bill': bill}).encode('utf-8'))
+                self._send_json({'bill': bill})
             except Exception as e:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid request', 'details': str(e)}).encode('utf-8'))
+                self._send_json({'error': 'Invalid request', 'details': str(e)}, 400)
             return
         
         # Default: not found
@@ -3403,8 +3553,7 @@ class PortalHandler(BaseHTTPRequestHandler):
             # Validate all form inputs for security
             content_type = self.headers.get('Content-Type', '')
             if not content_type.startswith('multipart/form-data'):
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'Invalid content type'}).encode('utf-8'))
+                self._send_json({'error': 'Invalid content type'}, 400)
                 return
             
             # Read and parse the form data
@@ -3414,38 +3563,39 @@ class PortalHandler(BaseHTTPRequestHandler):
             # Extract boundary from content type
             boundary = content_type.split('boundary=')[1] if 'boundary=' in content_type else None
             if not boundary:
-                self._set_json_headers(400)
-                self.wfile.write(json.dumps({'error': 'No boundary in multipart data'}).encode('utf-8'))
+                self._send_json({'error': 'No boundary in multipart data'}, 400)
                 return
             
             # Parse multipart form data
             fields = self._parse_multipart_data(form_data, boundary.encode())  # type: ignore
             
             # Validate all critical fields for security threats
-            critical_fields = ['first-name', 'last-name', 'email', 'phone', 'address', 
-                             'city', 'state', 'occupation', 'medical-conditions']
-            for field_name in critical_fields:
-                field_value = fields.get(field_name, '')
+            client_ip = self.client_address[0]
+            for field_name in QUOTE_CRITICAL_FIELDS:
+                field_value = fields.get(field_name)
                 if field_value:
-                    threat = validate_input_security(field_value, field_name, self.client_address[0])
-                    if threat:
-                        self._set_json_headers(400)
-                        self.wfile.write(json.dumps({'error': f'Invalid input in {field_name}: {threat}'}).encode('utf-8'))
+                    is_valid, threat = validate_input_security(field_value, client_ip, field_name)
+                    if not is_valid:
+                        self._send_json({'error': f'Invalid input in {field_name}: {threat}'}, 400)
                         return
             
             # Generate IDs
             customer_id = generate_customer_id()
-            policy_id = generate_policy_id()
-            uw_id = f"UW-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+            now = datetime.now()
+            now_iso = now.isoformat()
             
             # Create customer record
-            customer_name = f"{fields.get('first-name', '')} {fields.get('last-name', '')}".strip()
+            first_name = fields.get('first-name', '')
+            last_name = fields.get('last-name', '')
+            email = fields.get('email', '')
+            occupation = fields.get('occupation', '')
+            customer_name = f"{first_name} {last_name}".strip()
             CUSTOMERS[customer_id] = {
                 'id': customer_id,
                 'name': customer_name,
-                'first_name': fields.get('first-name', ''),
-                'last_name': fields.get('last-name', ''),
-                'email': fields.get('email', ''),
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': email,
                 'phone': fields.get('phone', ''),
                 'dob': fields.get('dob', ''),
                 'gender': fields.get('gender', ''),
@@ -3453,12 +3603,12 @@ class PortalHandler(BaseHTTPRequestHandler):
                 'city': fields.get('city', ''),
                 'state': fields.get('state', ''),
                 'zip': fields.get('zip', ''),
-                'occupation': fields.get('occupation', ''),
-                'created_date': datetime.now().isoformat()
+                'occupation': occupation,
+                'created_date': now_iso
             }
             
             # Provision portal login for the customer
-            cust_email = CUSTOMERS[customer_id].get('email') or f"{customer_id.lower()}@example.com"
+            cust_email = email or f"{customer_id.lower()}@example.com"
             temp_password = f"pw-{uuid.uuid4().hex[:10]}"
             pwd_hash = hash_password(temp_password)
             USERS[cust_email] = {
@@ -3477,66 +3627,47 @@ class PortalHandler(BaseHTTPRequestHandler):
             risk_score = 'low'
             medical_exam_required = False
             
-            smoking = fields.get('smoking', '').lower()
-            if smoking in ['yes', 'smoker', 'current']:
+            smoking_answer = fields.get('smoking')
+            health_answer = fields.get('health-conditions')
+            smoking = (smoking_answer or '').lower()
+            if smoking in SMOKER_ANSWERS:
                 risk_score = 'medium'
             
-            health_conditions = fields.get('health-conditions', '').lower()
-            if any(condition in health_conditions for condition in ['diabetes', 'heart', 'cancer', 'chronic']):
+            health_conditions = (health_answer or '').lower()
+            if any(condition in health_conditions for condition in HIGH_RISK_CONDITIONS):
                 risk_score = 'high'
                 medical_exam_required = True
             
-            # Create underwriting application
-            UNDERWRITING_APPLICATIONS[uw_id] = {
-                'id': uw_id,
-                'policy_id': policy_id,
-                'customer_id': customer_id,
-                'status': 'pending',
+            # Calculate premium
+            premium_data = calculate_premium({
+                'type': policy_type,
+                'coverage_amount': coverage_amount,
+                'age': self._calculate_age(fields.get('dob', '1990-01-01'), now),
+                'risk_score': risk_score
+            })
+            
+            # Create policy and underwriting application
+            policy = create_pending_policy(customer_id, policy_type, coverage_amount, risk_score, premium_data, now, application={
                 'questionnaire_responses': {
-                    'smoking': fields.get('smoking', 'No'),
-                    'health_conditions': fields.get('health-conditions', 'None'),
+                    'smoking': 'No' if smoking_answer is None else smoking_answer,
+                    'health_conditions': 'None' if health_answer is None else health_answer,
                     'medications': fields.get('medications', 'None'),
                     'family_history': fields.get('family-history', 'Good'),
-                    'occupation': fields.get('occupation', ''),
+                    'occupation': occupation,
                     'height': fields.get('height', ''),
                     'weight': fields.get('weight', '')
                 },
-                'risk_assessment': risk_score,
                 'medical_exam_required': medical_exam_required,
-                'submitted_date': datetime.now().isoformat()
-            }
-            
-            # Calculate premium
-            premium_data = calculate_premium({
-                'type': policy_type,
-                'coverage_amount': coverage_amount,
-                'age': self._calculate_age(fields.get('dob', '1990-01-01')),
-                'risk_score': risk_score
             })
+            policy_id, uw_id = policy['id'], policy['underwriting_id']
             
-            # Create policy
-            POLICIES[policy_id] = {
-                'id': policy_id,
-                'customer_id': customer_id,
-                'type': policy_type,
-                'coverage_amount': coverage_amount,
-                'annual_premium': premium_data['annual'],
-                'monthly_premium': premium_data['monthly'],
-                'status': 'pending_underwriting',
-                'underwriting_id': uw_id,
-                'risk_score': risk_score,
-                'start_date': datetime.now().isoformat(),
-                'end_date': (datetime.now() + timedelta(days=365)).isoformat(),
-                'created_date': datetime.now().isoformat()
-            }
-            
-            print(f"✅ Application submitted: {uw_id} for customer {customer_id}")
-            print(f"   Customer: {customer_name} ({cust_email})")
-            print(f"   Policy: {policy_type.title()} - ${coverage_amount:,}")
-            print(f"   Risk: {risk_score}, Status: pending")
+            # A single print call keeps the four lines together when submissions run concurrently
+            print(f"✅ Application submitted: {uw_id} for customer {customer_id}\n"
+                  f"   Customer: {customer_name} ({cust_email})\n"
+                  f"   Policy: {policy_type.title()} - ${coverage_amount:,}\n"
+                  f"   Risk: {risk_score}, Status: pending")
             
             # Return success response with all created records
-            self._set_json_headers(200)
             response = {
                 'success': True,
                 'application_id': uw_id,
@@ -3564,44 +3695,60 @@ class PortalHandler(BaseHTTPRequestHandler):
                     'status': 'pending'
                 }
             }
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self._send_json(response)
             
         except Exception as e:
-            self._set_json_headers(500)
-            self.wfile.write(json.dumps({'error': str(e), 'details': str(e.__class__.__name__)}).encode('utf-8'))
+            self._send_json({'error': str(e), 'details': str(e.__class__.__name__)}, 500)
     
     def _parse_multipart_data(self, data: bytes, boundary: bytes) -> Dict[str, str]:
         """Parse multipart/form-data into dictionary of fields"""
         fields: Dict[str, str] = {}
-        parts = data.split(b'--' + boundary)
+        delimiter = b'--' + boundary
         
-        for part in parts:
-            if b'Content-Disposition: form-data' not in part:
+        # Walk the parts by offset; only field names and values are ever copied out of data
+        start, size = 0, len(data)
+        while start <= size:
+            end = data.find(delimiter, start)
+            if end == -1:
+                end = size
+            part_start, start = start, end + len(delimiter)
+            if data.find(b'Content-Disposition: form-data', part_start, end) == -1:
                 continue
             
             # Extract field name
-            if b'name="' in part:
-                name_start = part.find(b'name="') + 6
-                name_end = part.find(b'"', name_start)
-                field_name = part[name_start:name_end].decode('utf-8')
-                
-                # Extract field value
-                value_start = part.find(b'\r\n\r\n')
-                if value_start != -1:
-                    value_start += 4
-                    value_end = part.rfind(b'\r\n')
-                    if value_end > value_start:
-                        field_value = part[value_start:value_end].decode('utf-8', errors='ignore').strip()
-                        if field_value:  # Only add non-empty values
-                            fields[field_name] = field_value
+            name_start = data.find(b'name="', part_start, end)
+            if name_start == -1:
+                continue
+            name_start += 6
+            name_end = data.find(b'"', name_start, end)
+            if name_end == -1:
+                continue
+            field_name = data[name_start:name_end].decode('utf-8')
+            
+            # Extract field value (the header block ends after the name, so search from there)
+            value_start = data.find(b'\r\n\r\n', name_end, end)
+            if value_start != -1:
+                value_start += 4
+                value_end = data.rfind(b'\r\n', part_start, end)
+                if value_end > value_start:
+                    field_value = data[value_start:value_end].decode('utf-8', errors='ignore').strip()
+                    if field_value:  # Only add non-empty values
+                        fields[field_name] = field_value
         
         return fields
     
-    def _calculate_age(self, dob_str: str) -> int:
+    def _calculate_age(self, dob_str: str, today: datetime | None = None) -> int:
         """Calculate age from date of birth string"""
         try:
-            dob = datetime.strptime(dob_str, '%Y-%m-%d')
-            today = datetime.now()
+            # Rigid YYYY-MM-DD input goes through the C ISO parser; anything else keeps strptime's rules
+            if len(dob_str) == 10 and dob_str[4] == dob_str[7] == '-':
+                try:
+                    dob = datetime.fromisoformat(dob_str)
+                except ValueError:
+                    dob = datetime.strptime(dob_str, '%Y-%m-%d')
+            else:
+                dob = datetime.strptime(dob_str, '%Y-%m-%d')
+            today = today or datetime.now()
             age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
             return age
         except:
@@ -3610,7 +3757,6 @@ class PortalHandler(BaseHTTPRequestHandler):
     def calculate_demo_premium(self) -> Dict[str, Any]:
         """Calculate a demo premium estimate"""
         # Simple demo calculation
-        import random
         base_premium = random.randint(500, 2000)
         return {
             'monthly': round(base_premium / 12, 2),
@@ -3619,6 +3765,12 @@ class PortalHandler(BaseHTTPRequestHandler):
         }
 
 
+class PortalHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a listen backlog sized for connection bursts"""
+    daemon_threads = True  # Ensure worker threads exit on shutdown
+    request_queue_size = LISTEN_BACKLOG
+
+
 def run_server(port: int = PORT) -> None:
     # Initialize database if enabled
     if USE_DATABASE and database_enabled:
@@ -3646,7 +3798,6 @@ def run_server(port: int = PORT) -> None:
             
             # Seed sample customer data (test accounts)
             try:
-                from database.seeds import seed_sample_data
                 seed_sample_data()
                 print("✓ Sample customer data seeded (asaf@assurance.co.il, etc.)")
             except Exception as e:
@@ -3657,8 +3808,7 @@ def run_server(port: int = PORT) -> None:
             # Don't fail - just fall back to in-memory
     
     server_address = ('0.0.0.0', port)
-    httpd = ThreadingHTTPServer(server_address, PortalHandler)
-    httpd.daemon_threads = True  # Ensure worker threads exit on shutdown
+    httpd = PortalHTTPServer(server_address, PortalHandler)
     httpd.timeout = CONNECTION_TIMEOUT  # Set connection timeout
     print(f'\n🚀 Serving web portal at http://0.0.0.0:{port} (static from {ROOT})')
     print(f'   Access via: http://localhost:{port}')
@@ -3683,15 +3833,7 @@ def run_tests():
     }, indent=2))
     # Test connectors if available
     try:
-        # Load connectors module from file location (works when server.py is run directly)
-        import importlib.util
-        conn_path = os.path.join(os.path.dirname(__file__), 'connectors.py')
-        spec = importlib.util.spec_from_file_location('web_portal.connectors', conn_path)
-        if spec and spec.loader:
-            connectors = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(connectors)
-        else:
-            raise ImportError('Cannot load connectors')
+        connectors = load_connectors()
         print('\nConnector demo results:')
         res = connectors.demo_validators()
         for k, v in res.items():